@@ -1,13 +1,31 @@
+import asyncio
 from langchain_core.messages import SystemMessage
-from langchain_core.prompts import ChatPromptTemplate
 from app.tools.data_tools import check_credit_limit, request_limit_increase
 from pydantic import BaseModel, Field
-from app.core.llm import llm
-from app.models.schemas import CreditIntent, InterviewOfferIntent
-from app.core.agent_utils import check_exit_intent
+from app.models.schemas import CreditTurn, InterviewOfferIntent
+from app.core.agent_utils import EXIT_INSTRUCTION, rules_exit_intent, merge_exit_intent
 from app.core.error_handler import generate_error_response
-
-def credit_node(state):
+from app.core.classifier_cache import classify
+from app.core.chains import get_chain, register_chain
+
+CREDIT_INTENT_CHAIN = register_chain("credit_intent", [
+    ("system", "Você é um assistente de crédito. Classifique a intenção do usuário.\n"
+               "- 'CHECK_LIMIT': Perguntas sobre 'qual meu limite', 'quanto tenho'.\n"
+               "- 'REQUEST_INCREASE': Pedidos de aumento, ou apenas um número/valor solto (ex: '3000', 'quero 5000').\n"
+               "- 'OTHER': Qualquer outra coisa.\n" + EXIT_INSTRUCTION),
+    ("user", "{input}")
+], CreditTurn)
+
+INTERVIEW_OFFER_CHAIN = register_chain("interview_offer", [
+    ("system", "Você é um assistente bancário. O usuário recebeu uma oferta para fazer uma entrevista e aumentar o score.\n"
+               "Analise a resposta dele e classifique como:\n"
+               "- 'ACCEPT': Se ele concordou, disse sim, bora, ok, pode ser.\n"
+               "- 'DECLINE': Se ele recusou, disse não, agora não, deixa pra lá.\n"
+               "- 'UNCLEAR': Se não dá para saber."),
+    ("user", "{input}")
+], InterviewOfferIntent)
+
+async def credit_node(state):
     """
     Agente de Crédito:
     Lida com consultas sobre limite atual e solicitações de aumento.
@@ -17,31 +35,27 @@ def credit_node(state):
     user_data = state.get("user_data")
     last_message = messages[-1].content
 
-    if check_exit_intent(last_message):
-        return {
-            "messages": [SystemMessage(content="Atendimento finalizado com sucesso. Foi um prazer te ajudar! Se precisar de mais alguma coisa, é só mandar uma nova mensagem que eu volto a te atender. Até logo!")],
-            "next_node": "end",
-            "active_agent": "triage" 
-        }
+    exit_rule = rules_exit_intent(last_message)
+    exit_response = {
+        "messages": [SystemMessage(content="Atendimento finalizado com sucesso. Foi um prazer te ajudar! Se precisar de mais alguma coisa, é só mandar uma nova mensagem que eu volto a te atender. Até logo!")],
+        "next_node": "end",
+        "active_agent": "triage" 
+    }
 
-    structured_llm = llm.with_structured_output(CreditIntent)
+    if exit_rule:
+        return exit_response
 
-    classify_prompt = ChatPromptTemplate.from_messages([
-        ("system", "Você é um assistente de crédito. Classifique a intenção do usuário.\n"
-                   "- 'CHECK_LIMIT': Perguntas sobre 'qual meu limite', 'quanto tenho'.\n"
-                   "- 'REQUEST_INCREASE': Pedidos de aumento, ou apenas um número/valor solto (ex: '3000', 'quero 5000').\n"
-                   "- 'OTHER': Qualquer outra coisa.\n"),
-        ("user", "{input}")
-    ])
-    
     try:
-        chain = classify_prompt | structured_llm
-        result = chain.invoke({"input": last_message})
+        result = await classify(get_chain(CREDIT_INTENT_CHAIN), CreditTurn, "v1", {"input": last_message})
+
+        if merge_exit_intent(exit_rule, result.is_exit):
+            return exit_response
+
         intent = result.intent
         value = result.value
 
         if intent == "CHECK_LIMIT":
-            limit = check_credit_limit(user_data["cpf"])
+            limit = await asyncio.to_thread(check_credit_limit, user_data["cpf"])
             return {
                 "messages": [SystemMessage(content=f"Seu limite de crédito atual é de R$ {limit:.2f}.\n\nPosso te ajudar com mais alguma coisa? Se quiser, podemos ver um aumento de limite, consultar taxas de câmbio ou encerrar o atendimento por aqui.")],
                 "next_node": "end", 
@@ -50,7 +64,7 @@ def credit_node(state):
 
         elif intent == "REQUEST_INCREASE":
             if value:
-                result = request_limit_increase(user_data["cpf"], float(value))
+                result = await asyncio.to_thread(request_limit_increase, user_data["cpf"], float(value))
 
                 if result["status"] == "aprovado":
                     return {
@@ -87,7 +101,7 @@ def credit_node(state):
     except Exception as e:
 
         print(f"Error in credit agent: {e}")
-        error_msg = generate_error_response(str(e))
+        error_msg = await generate_error_response(str(e))
 
         return {
             "messages": [SystemMessage(content=error_msg)],
@@ -95,7 +109,7 @@ def credit_node(state):
             "active_agent": "triage"
         }
 
-def interview_offer_node(state):
+async def interview_offer_node(state):
     """
     Lida com a resposta do usuário à oferta de entrevista.
     """
@@ -103,20 +117,8 @@ def interview_offer_node(state):
     messages = state.get("messages", [])
     last_message = messages[-1].content.lower()
 
-    structured_llm = llm.with_structured_output(InterviewOfferIntent)
-
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", "Você é um assistente bancário. O usuário recebeu uma oferta para fazer uma entrevista e aumentar o score.\n"
-                   "Analise a resposta dele e classifique como:\n"
-                   "- 'ACCEPT': Se ele concordou, disse sim, bora, ok, pode ser.\n"
-                   "- 'DECLINE': Se ele recusou, disse não, agora não, deixa pra lá.\n"
-                   "- 'UNCLEAR': Se não dá para saber."),
-        ("user", "{input}")
-    ])
-
     try:
-        chain = prompt | structured_llm
-        result = chain.invoke({"input": last_message})
+        result = await classify(get_chain(INTERVIEW_OFFER_CHAIN), InterviewOfferIntent, "v1", {"input": last_message})
         decision = result.decision
     except:
         decision = "UNCLEAR"
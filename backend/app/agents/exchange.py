@@ -1,12 +1,18 @@
 from langchain_core.messages import SystemMessage
-from app.tools.search_tools import get_exchange_rate
-from app.models.schemas import CurrencyExtraction
-from app.core.llm import llm
-from langchain_core.prompts import ChatPromptTemplate
-from app.core.agent_utils import check_exit_intent
+from app.tools.search_tools import get_exchange_quote
+from app.models.schemas import CurrencyTurn, SUPPORTED_CURRENCIES
+from app.core.agent_utils import EXIT_INSTRUCTION, rules_exit_intent, merge_exit_intent
 from app.core.error_handler import generate_error_response
+from app.core.classifier_cache import classify
+from app.core.chains import get_chain, register_chain
 
-def exchange_node(state):
+CURRENCY_CHAIN = register_chain("currency_extraction", [
+    ("system", "Você é um especialista em câmbio. Extraia o código da moeda que o usuário quer consultar (" + ", ".join(SUPPORTED_CURRENCIES) + "). "
+               "Se for outra moeda, retorne OTHER. Se não for claro, assuma USD." + EXIT_INSTRUCTION),
+    ("user", "{input}")
+], CurrencyTurn)
+
+async def exchange_node(state):
     """
     Agente de Câmbio:
     Retorna cotações de moedas.
@@ -15,27 +21,46 @@ def exchange_node(state):
         messages = state.get("messages", [])
         last_message = messages[-1].content.upper()
 
-        if check_exit_intent(last_message):
+        exit_rule = rules_exit_intent(last_message)
+        exit_response = {
+            "messages": [SystemMessage(content="Atendimento finalizado com sucesso. Foi um prazer te ajudar! Se precisar de mais alguma coisa, é só mandar uma nova mensagem que eu volto a te atender. Até logo!")],
+            "next_node": "end",
+            "active_agent": "triage"
+        }
+
+        if exit_rule:
+            return exit_response
+
+        result = await classify(get_chain(CURRENCY_CHAIN), CurrencyTurn, "v2", {"input": last_message})
+
+        if merge_exit_intent(exit_rule, result.is_exit):
+            return exit_response
+
+        currency = result.currency_code
+
+        if currency == "OTHER":
+            return {
+                "messages": [SystemMessage(content=f"Ainda não tenho cotação para essa moeda. As moedas disponíveis são: {', '.join(SUPPORTED_CURRENCIES)}.\n\nQual delas você gostaria de consultar?")],
+                "next_node": "end",
+                "active_agent": "exchange_agent"
+            }
+
+        quote = await get_exchange_quote(currency)
+
+        if quote is None:
             return {
-                "messages": [SystemMessage(content="Atendimento finalizado com sucesso. Foi um prazer te ajudar! Se precisar de mais alguma coisa, é só mandar uma nova mensagem que eu volto a te atender. Até logo!")],
+                "messages": [SystemMessage(content=f"No momento não consegui obter a cotação do {currency}. Tente novamente em instantes.\n\nPosso te ajudar com serviços de crédito ou finalizar nosso atendimento?")],
                 "next_node": "end",
                 "active_agent": "triage"
             }
 
-        structured_llm = llm.with_structured_output(CurrencyExtraction)
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", "Você é um especialista em câmbio. Extraia o código da moeda que o usuário quer consultar (USD, EUR, GBP). Se não for claro, assuma USD."),
-            ("user", "{input}")
-        ])
-        
-        chain = prompt | structured_llm
-        result = chain.invoke({"input": last_message})
-        currency = result.currency_code
+        rate_text = f"A cotação atual do {currency} é R$ {quote.rate:.2f}."
 
-        rate = get_exchange_rate(currency)
+        if quote.stale:
+            rate_text = f"A última cotação disponível do {currency} é R$ {quote.rate:.2f} (atualizada há {int(quote.age // 60)} min)."
 
         return {
-            "messages": [SystemMessage(content=f"A cotação atual do {currency} é R$ {rate:.2f}.\n\nDeseja consultar outra moeda? Se preferir, também posso te ajudar com serviços de crédito ou finalizar nosso atendimento.")],
+            "messages": [SystemMessage(content=f"{rate_text}\n\nDeseja consultar outra moeda? Se preferir, também posso te ajudar com serviços de crédito ou finalizar nosso atendimento.")],
             "next_node": "end",
             "active_agent": "triage"
         }
@@ -43,7 +68,7 @@ def exchange_node(state):
     except Exception as e:
 
         print(f"Error in exchange agent: {e}")
-        error_msg = generate_error_response(str(e))
+        error_msg = await generate_error_response(str(e))
         
         return {
             "messages": [SystemMessage(content=error_msg)],
@@ -1,11 +1,16 @@
+import asyncio
 from langchain_core.messages import SystemMessage
-from langchain_core.prompts import ChatPromptTemplate
 from app.tools.data_tools import update_user_score
+from app.tools.scoring import PESO_DEPENDENTES, PESO_DIVIDAS, PESO_EMPREGO, PESO_RENDA, SCORE_FALLBACK
 from pydantic import BaseModel, Field
-from app.core.llm import llm
-from app.core.agent_utils import check_exit_intent
+from app.core.agent_utils import EXIT_INSTRUCTION, check_exit_intent, rules_exit_intent, merge_exit_intent
 from app.core.error_handler import generate_error_response
-from app.models.schemas import ValidationResult, InterviewNormalization
+from app.models.schemas import ValidationTurn, InterviewNormalization, InterviewFieldNormalization
+from app.core.classifier_cache import classify
+from app.core.chains import get_chain, register_chain
+from app.core.interview_parsers import ANSWER_PARSERS, parse_answer
+from app.core.pending_tasks import PendingTasks
+from langchain_core.runnables import RunnableConfig
 
 QUESTIONS = [
     "Qual é a sua renda mensal aproximada?",
@@ -15,25 +20,43 @@ QUESTIONS = [
     "Você possui dívidas ativas? (sim/não)"
 ]
 
-def validate_answer(question: str, answer: str) -> dict:
+VALIDATION_CHAIN = register_chain("answer_validation", [
+    ("system", "Você é um validador de dados bancários. Analise se a RESPOSTA do usuário faz sentido para a PERGUNTA feita.\n"
+               "Se fizer sentido, extraia o valor limpo/formatado em 'cleaned_value'.\n"
+               "Se NÃO fizer sentido (ex: risadas, texto aleatório, fugiu do assunto), marque 'valid' como False e gere um 'feedback'." + EXIT_INSTRUCTION),
+    ("user", "PERGUNTA: {question}\nRESPOSTA: {answer}")
+], ValidationTurn)
+
+NORMALIZATION_CHAIN = register_chain("interview_normalization", [
+    ("system", "Você é um analista de crédito. Seu objetivo é extrair e normalizar os dados financeiros de uma entrevista.\n"
+               "Converta valores monetários para float (ex: '5k' -> 5000.0).\n"
+               "Classifique o emprego em: 'formal' (CLT, funcionário público), 'autônomo' (PJ, freelancer, empresário) ou 'desempregado'.\n"
+               "Conte o número total de dependentes.\n"
+               "Identifique se há dívidas (Sim/Não)."),
+    ("user", "Dados da entrevista:\n{input}")
+], InterviewNormalization)
+
+FIELD_NORMALIZATION_CHAIN = register_chain("interview_field_normalization", [
+    ("system", "Você é um analista de crédito. Normalize a resposta do usuário preenchendo APENAS o campo '{field}'.\n"
+               "Converta valores monetários para float (ex: '5k' -> 5000.0).\n"
+               "Classifique o emprego em: 'formal' (CLT, funcionário público), 'autônomo' (PJ, freelancer, empresário) ou 'desempregado'.\n"
+               "Conte o número total de dependentes.\n"
+               "Identifique se há dívidas (Sim/Não)."),
+    ("user", "PERGUNTA: {question}\nRESPOSTA: {answer}")
+], InterviewFieldNormalization)
+
+pending_normalizations = PendingTasks()
+
+async def validate_answer(question: str, answer: str) -> dict:
     """
-    Usa LLM para validar se a resposta é apropriada para a pergunta.
-    Retorna dict com chaves correspondentes a ValidationResult.
+    Usa LLM para validar se a resposta é apropriada para a pergunta
+    e, na mesma chamada, se o usuário quer sair da conversa.
+    Retorna dict com chaves correspondentes a ValidationTurn.
     """
 
-    structured_llm = llm.with_structured_output(ValidationResult)
-
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", "Você é um validador de dados bancários. Analise se a RESPOSTA do usuário faz sentido para a PERGUNTA feita.\n"
-                   "Se fizer sentido, extraia o valor limpo/formatado em 'cleaned_value'.\n"
-                   "Se NÃO fizer sentido (ex: risadas, texto aleatório, fugiu do assunto), marque 'valid' como False e gere um 'feedback'."),
-        ("user", "PERGUNTA: {question}\nRESPOSTA: {answer}")
-    ])
-
     try:
 
-        chain = prompt | structured_llm
-        result = chain.invoke({"question": question, "answer": answer})
+        result = await classify(get_chain(VALIDATION_CHAIN), ValidationTurn, "v1", {"question": question, "answer": answer})
 
         return result.dict()
         
@@ -41,33 +64,53 @@ def validate_answer(question: str, answer: str) -> dict:
 
         print(f"Validation error: {e}")
 
-        return {"valid": True, "cleaned_value": answer, "feedback": ""}
+        return {"valid": True, "cleaned_value": answer, "feedback": "", "is_exit": False}
 
-def normalize_data(answers: list) -> InterviewNormalization:
+async def normalize_data(answers: list) -> InterviewNormalization:
     """
     Usa LLM para normalizar as respostas soltas em um objeto estruturado para cálculo.
     """
-    structured_llm = llm.with_structured_output(InterviewNormalization)
-    
     context = ""
     for q, a in zip(QUESTIONS, answers):
         context += f"P: {q}\nR: {a}\n"
 
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", "Você é um analista de crédito. Seu objetivo é extrair e normalizar os dados financeiros de uma entrevista.\n"
-                   "Converta valores monetários para float (ex: '5k' -> 5000.0).\n"
-                   "Classifique o emprego em: 'formal' (CLT, funcionário público), 'autônomo' (PJ, freelancer, empresário) ou 'desempregado'.\n"
-                   "Conte o número total de dependentes.\n"
-                   "Identifique se há dívidas (Sim/Não)."),
-        ("user", "Dados da entrevista:\n{input}")
-    ])
+    return await classify(get_chain(NORMALIZATION_CHAIN), InterviewNormalization, "v1", {"input": context}, cacheable=False)
+
+async def normalize_field(field: str, question: str, answer: str):
+    """
+    Normaliza uma única resposta para o campo tipado correspondente.
+    Roda em segundo plano enquanto o usuário responde a próxima pergunta
+    ou, na última pergunta, junto com a validação.
+    """
+
+    try:
+        result = await classify(get_chain(FIELD_NORMALIZATION_CHAIN), InterviewFieldNormalization, "v1",
+                                {"field": field, "question": question, "answer": answer})
+
+        return getattr(result, field)
+
+    except Exception as e:
+
+        print(f"Error normalizing interview field {field}: {e}")
+
+        return None
 
-    chain = prompt | structured_llm
-    return chain.invoke({"input": context})
+async def build_profile(answers: list, values: dict) -> InterviewNormalization:
+    """
+    Monta os dados para o cálculo do score. Se os parsers determinísticos
+    reconheceram todas as respostas, não há chamada ao LLM; senão, as
+    respostas são normalizadas pelo LLM.
+    """
+
+    if all(values.get(field) is not None for field, _ in ANSWER_PARSERS):
+        return InterviewNormalization(**values)
+
+    return await normalize_data(answers)
 
 def calculate_score(data: InterviewNormalization):
     """
     Calcula o score com base nos dados JÁ NORMALIZADOS.
+    Os pesos ficam em app.tools.scoring, junto da versão vetorizada (score_arrays).
     """
     try:
         renda = data.income
@@ -76,85 +119,109 @@ def calculate_score(data: InterviewNormalization):
         num_dep = data.dependents
         tem_dividas = data.has_debts
         
-        peso_renda = 30
-        
-        peso_emprego = {
-            "formal": 300,
-            "autônomo": 200,
-            "desempregado": 0
-        }
-
-        peso_dependentes = {
-            0: 100,
-            1: 80,
-            2: 60,
-            "3+": 30
-        }
-
-        peso_dividas = {
-            True: -100,
-            False: 100
-        }
-
-        p_emp = peso_emprego.get(emprego, 0)
+        p_emp = PESO_EMPREGO.get(emprego, 0)
 
         if num_dep >= 3:
-            p_dep = peso_dependentes["3+"]
-        elif num_dep in peso_dependentes:
-            p_dep = peso_dependentes[num_dep]
+            p_dep = PESO_DEPENDENTES["3+"]
+        elif num_dep in PESO_DEPENDENTES:
+            p_dep = PESO_DEPENDENTES[num_dep]
         else:
             p_dep = 30 
 
-        p_div = peso_dividas[tem_dividas]
+        p_div = PESO_DIVIDAS[tem_dividas]
 
         
-        score = (renda / (despesas + 1)) * peso_renda + p_emp + p_dep + p_div
+        score = (renda / (despesas + 1)) * PESO_RENDA + p_emp + p_dep + p_div
 
         return min(1000, max(0, int(score))) 
 
     except Exception as e:
         print(f"Error calculating score: {e}")
-        return 500 
+        return SCORE_FALLBACK
 
-def interview_node(state):
+async def interview_node(state, config: RunnableConfig = None):
     """
     Agente de Entrevista:
     Faz perguntas sequencialmente e atualiza o score no final.
     Inclui loop de validação inteligente.
+    Respostas que os parsers não reconhecem são normalizadas em segundo plano
+    (por conversa e campo); o último turno só monta os campos, calcula e grava.
     """
 
     messages = state.get("messages", [])
     interview_step = state.get("interview_step", 0)
     interview_answers = state.get("interview_answers", [])
+    interview_values = state.get("interview_values") or {}
     user_data = state.get("user_data")
+    thread_id = ((config or {}).get("configurable") or {}).get("thread_id", "default")
+
+    exit_response = {
+        "messages": [SystemMessage(content="Atendimento finalizado com sucesso. Foi um prazer te ajudar! Se precisar de mais alguma coisa, é só mandar uma nova mensagem que eu volto a te atender. Até logo!")],
+        "interview_step": 0,
+        "interview_answers": [],
+        "interview_values": {},
+        "next_node": "end",
+        "active_agent": "triage"
+    }
 
     try:
+        exit_rule = None
+
         if messages and interview_step > 0:
             last_message = messages[-1].content
+            exit_rule = rules_exit_intent(last_message)
 
-            if check_exit_intent(last_message):
-
-                 return {
-                    "messages": [SystemMessage(content="Atendimento finalizado com sucesso. Foi um prazer te ajudar! Se precisar de mais alguma coisa, é só mandar uma nova mensagem que eu volto a te atender. Até logo!")],
-                    "interview_step": 0,
-                    "interview_answers": [],
-                    "next_node": "end",
-                    "active_agent": "triage"
-                }
+            if exit_rule:
+                pending_normalizations.cancel(thread_id)
+                return exit_response
 
         if interview_step == 0:
+            pending_normalizations.cancel(thread_id)
 
             return {
                 "messages": [SystemMessage(content=QUESTIONS[0])],
                 "interview_step": 1,
                 "interview_answers": [],
+                "interview_values": {},
                 "next_node": "end", 
                 "active_agent": "interview_agent"
             }
 
         last_answer = messages[-1].content
         question_asked = QUESTIONS[interview_step - 1]
-        validation = validate_answer(question_asked, last_answer)
+        field, value = parse_answer(interview_step - 1, last_answer)
+
+        if value is not None:
+            # O parser dispensa a validação, mas não a detecção de saída quando
+            # as regras não decidiram (ex: "2, mas não quero continuar").
+            if exit_rule is None and await check_exit_intent(last_answer):
+                pending_normalizations.cancel(thread_id)
+                return exit_response
+
+            validation = {"valid": True, "cleaned_value": last_answer}
+
+        elif interview_step < len(QUESTIONS):
+            validation = await validate_answer(question_asked, last_answer)
+
+        else:
+            # Última pergunta: normaliza junto com a validação para que o turno
+            # final não espere duas chamadas em sequência. Se a resposta for
+            # inválida, o valor é descartado.
+            validation, speculative_value = await asyncio.gather(
+                validate_answer(question_asked, last_answer),
+                normalize_field(field, question_asked, last_answer)
+            )
+
+        if value is None:
+            if merge_exit_intent(exit_rule, validation.get("is_exit", False)):
+                pending_normalizations.cancel(thread_id)
+                return exit_response
+
+            if validation.get("valid", False):
+                value = parse_answer(interview_step - 1, validation.get("cleaned_value") or "")[1]
+
+                if value is None and interview_step == len(QUESTIONS):
+                    value = speculative_value
 
         if not validation.get("valid", False):
 
@@ -170,6 +237,10 @@ def interview_node(state):
 
         cleaned_value = validation.get("cleaned_value", last_answer)
         new_answers = interview_answers + [cleaned_value]
+        new_values = {**interview_values, **pending_normalizations.collect_done(thread_id), field: value}
+
+        if value is None and interview_step < len(QUESTIONS):
+            pending_normalizations.submit(thread_id, field, normalize_field(field, question_asked, cleaned_value))
 
         if interview_step < len(QUESTIONS):
 
@@ -177,19 +248,23 @@ def interview_node(state):
                 "messages": [SystemMessage(content=QUESTIONS[interview_step])],
                 "interview_step": interview_step + 1,
                 "interview_answers": new_answers,
+                "interview_values": new_values,
                 "next_node": "end",
                 "active_agent": "interview_agent"
             }
 
-        normalized_data = normalize_data(new_answers)
+        new_values.update({k: v for k, v in (await pending_normalizations.gather(thread_id)).items() if v is not None})
+
+        normalized_data = await build_profile(new_answers, new_values)
         new_score = calculate_score(normalized_data)
-        update_user_score(user_data["cpf"], new_score)
+        await asyncio.to_thread(update_user_score, user_data["cpf"], new_score)
 
         return {
             "messages": [SystemMessage(content=f"Obrigado! Suas informações foram atualizadas e seu novo score é {new_score}.\n\n"
                                                "Pronto! Atualizei suas informações e seu score. Agora, por favor, me diga novamente qual o valor de limite que você gostaria de solicitar para que eu possa fazer uma nova análise.")],
             "interview_step": 0, 
             "interview_answers": [],
+            "interview_values": {},
             "next_node": "end", 
             "active_agent": "credit_agent" 
         }
@@ -197,7 +272,7 @@ def interview_node(state):
     except Exception as e:
 
         print(f"Error in interview agent: {e}")
-        error_msg = generate_error_response(str(e))
+        error_msg = await generate_error_response(str(e))
         
         return {
             "messages": [SystemMessage(content=error_msg)],
@@ -1,34 +1,85 @@
+import asyncio
 from langchain_core.messages import SystemMessage
-from langchain_core.prompts import ChatPromptTemplate
 from app.tools.data_tools import authenticate_user
 import re
 from pydantic import BaseModel, Field
-from app.models.schemas import TriageIntent, GreetingIntent, CPFExtraction, DateExtraction
-from app.core.llm import llm
-from app.core.agent_utils import check_exit_intent
+from app.models.schemas import TriageTurn, GreetingTurn, CPFTurn, DateTurn
+from app.core.agent_utils import EXIT_INSTRUCTION, check_exit_intent, rules_exit_intent, merge_exit_intent
 from app.core.error_handler import generate_error_response
+from app.core.classifier_cache import classify
+from app.core.chains import get_chain, register_chain
+from app.core.llm_limiter import PRIORITY_AUTH, PRIORITY_LOW, llm_priority_scope
+from app.core.extractors import CPF_STRICT, extract_cpf, is_valid_cpf, parse_birth_date
+
+GREETING_CHAIN = register_chain("greeting_intent", [
+    ("system", "Analise se a mensagem do usuário é apenas uma saudação inicial (ex: 'Oi', 'Olá', 'Bom dia', 'Start') ou se já contém alguma solicitação específica.\n"
+               "Se for só saudação, retorne True. Se tiver conteúdo, retorne False." + EXIT_INSTRUCTION),
+    ("user", "{input}")
+], GreetingTurn)
+
+GREETING_REPLY_CHAIN = register_chain("greeting_reply", [
+    ("system", "Você é um atendente bancário virtual. Seu objetivo agora é APENAS pedir o CPF do usuário para iniciar o atendimento.\n"
+               "Instruções:\n"
+               "1. Se o usuário disse 'Olá', 'Bom dia', etc., responda a saudação brevemente.\n"
+               "2. Se o usuário perguntou algo, diga que precisa identificar o cliente primeiro.\n"
+               "3. FINALIZE A MENSAGEM PEDINDO O CPF (ex: 'Por favor, me informe seu CPF para começarmos').\n"
+               "Não invente dados, não simule conversas longas. Seja direto e educado."),
+    ("user", "{input}")
+])
+
+CPF_CHAIN = register_chain("cpf_extraction", [
+    ("system", "Extraia o CPF da mensagem do usuário. Retorne APENAS os números. Se não encontrar um CPF válido (11 dígitos), retorne vazio." + EXIT_INSTRUCTION),
+    ("user", "{input}")
+], CPFTurn)
+
+DATE_CHAIN = register_chain("date_extraction", [
+    ("system", "Extraia a data de nascimento da mensagem do usuário e formate EXATAMENTE como YYYY-MM-DD.\n"
+               "Aceite formatos como:\n"
+               "- '20/10/2000' -> '2000-10-20'\n"
+               "- '2000-10-20' -> '2000-10-20' (já está correto)\n"
+               "- '20 de outubro de 2000' -> '2000-10-20'\n"
+               "- '10-05-90' -> '1990-05-10'\n"
+               "Se não encontrar uma data válida, retorne 'INVALID'." + EXIT_INSTRUCTION),
+    ("user", "{input}")
+], DateTurn)
+
+TRIAGE_CHAIN = register_chain("triage_intent", [
+    ("system", "Você é um classificador de intenções bancárias. "
+               "As categorias são: 'CREDITO' (limite, aumento de limite), 'CAMBIO' (cotação de moedas), 'OUTROS' (saudação, ajuda geral). " + EXIT_INSTRUCTION),
+    ("user", "{input}")
+], TriageTurn)
+
+def exit_response():
+    """
+    Encerra o atendimento e reinicia o fluxo da triagem.
+    """
 
-def handle_greeting(last_message: str):
+    return {
+        "messages": [SystemMessage(content="Atendimento finalizado com sucesso. Foi um prazer te ajudar! Se precisar de mais alguma coisa, é só mandar uma nova mensagem que eu volto a te atender. Até logo!")],
+        "next_node": "end",
+        "active_agent": "triage", 
+        "triage_step": "greeting", 
+        "temp_cpf": None
+    }
+
+async def handle_greeting(last_message: str, exit_rule: bool = None):
     """
     1. Saudação
     Lida com a saudação inicial e solicita o CPF.
     """
-
-    structured_llm = llm.with_structured_output(GreetingIntent)
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", "Analise se a mensagem do usuário é apenas uma saudação inicial (ex: 'Oi', 'Olá', 'Bom dia', 'Start') ou se já contém alguma solicitação específica.\n"
-                   "Se for só saudação, retorne True. Se tiver conteúdo, retorne False."),
-        ("user", "{input}")
-    ])
     
     is_greeting = False
+    is_exit = False
     try:
-        chain = prompt | structured_llm
-        result = chain.invoke({"input": last_message})
+        result = await classify(get_chain(GREETING_CHAIN), GreetingTurn, "v1", {"input": last_message})
         is_greeting = result.is_greeting
+        is_exit = result.is_exit
     except:
         is_greeting = True 
 
+    if merge_exit_intent(exit_rule, is_exit):
+        return exit_response()
+
     if is_greeting:
          return {
             "messages": [SystemMessage(content="Olá! Para que eu possa te ajudar, preciso confirmar seus dados. Por favor, me informe seu CPF para começarmos.")],
@@ -37,18 +88,7 @@ def handle_greeting(last_message: str):
             "active_agent": "triage"
         }
 
-    greeting_prompt = ChatPromptTemplate.from_messages([
-        ("system", "Você é um atendente bancário virtual. Seu objetivo agora é APENAS pedir o CPF do usuário para iniciar o atendimento.\n"
-                   "Instruções:\n"
-                   "1. Se o usuário disse 'Olá', 'Bom dia', etc., responda a saudação brevemente.\n"
-                   "2. Se o usuário perguntou algo, diga que precisa identificar o cliente primeiro.\n"
-                   "3. FINALIZE A MENSAGEM PEDINDO O CPF (ex: 'Por favor, me informe seu CPF para começarmos').\n"
-                   "Não invente dados, não simule conversas longas. Seja direto e educado."),
-        ("user", "{input}")
-    ])
-
-    chain = greeting_prompt | llm
-    response_content = chain.invoke({"input": last_message}).content
+    response_content = (await get_chain(GREETING_REPLY_CHAIN).ainvoke({"input": last_message})).content
 
     return {
         "messages": [SystemMessage(content=response_content)],
@@ -57,32 +97,32 @@ def handle_greeting(last_message: str):
         "active_agent": "triage"
     }
 
-def handle_cpf_collection(last_message: str):
+async def handle_cpf_collection(last_message: str, exit_rule: bool = None):
     """
     2. Coleta CPF
     Extrai e valida o CPF da mensagem do usuário.
+    O extrator determinístico resolve os formatos comuns; o LLM só é
+    chamado quando ele não encontra um CPF.
     """
 
-    cpf_clean = re.sub(r'\D', '', last_message)
+    cpf_input = extract_cpf(last_message)
 
-    if len(cpf_clean) == 11 and len(last_message.strip()) < 20:
-         cpf_input = cpf_clean
+    if cpf_input:
+        if exit_rule is None and await check_exit_intent(last_message):
+            return exit_response()
 
     else:
-        structured_llm = llm.with_structured_output(CPFExtraction)
-        extract_cpf_prompt = ChatPromptTemplate.from_messages([
-            ("system", "Extraia o CPF da mensagem do usuário. Retorne APENAS os números. Se não encontrar um CPF válido (11 dígitos), retorne vazio."),
-            ("user", "{input}")
-        ])
-
-        chain = extract_cpf_prompt | structured_llm
-        result = chain.invoke({"input": last_message})
+        result = await classify(get_chain(CPF_CHAIN), CPFTurn, "v1", {"input": last_message})
+
+        if merge_exit_intent(exit_rule, result.is_exit):
+            return exit_response()
+
         cpf_input = result.cpf
 
         if cpf_input:
              cpf_input = re.sub(r'\D', '', cpf_input)
 
-    if not cpf_input or len(cpf_input) != 11:
+    if not cpf_input or len(cpf_input) != 11 or (CPF_STRICT and not is_valid_cpf(cpf_input)):
 
         return {
             "messages": [SystemMessage(content="Não consegui identificar um CPF válido. Por favor, digite apenas os 11 números do seu CPF.")],
@@ -98,7 +138,7 @@ def handle_cpf_collection(last_message: str):
         "active_agent": "triage"
     }
 
-def handle_dob_collection(last_message: str, temp_cpf: str, auth_attempts: int):
+async def handle_dob_collection(last_message: str, temp_cpf: str, auth_attempts: int, exit_rule: bool = None):
     """
     3. Coleta Data de Nascimento
     4. Validação
@@ -106,28 +146,18 @@ def handle_dob_collection(last_message: str, temp_cpf: str, auth_attempts: int):
     6. Se falha -> Retenta ou Encerra
     """
 
-    dob_regex = r"\b(19|20)\d{2}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])\b"
-
-    match = re.search(dob_regex, last_message)
+    dob_input = parse_birth_date(last_message)
 
-    if match:
-        dob_input = match.group(0)
+    if dob_input:
+        if exit_rule is None and await check_exit_intent(last_message):
+            return exit_response()
 
     else:
-        structured_llm = llm.with_structured_output(DateExtraction)
-        extract_dob_prompt = ChatPromptTemplate.from_messages([
-            ("system", "Extraia a data de nascimento da mensagem do usuário e formate EXATAMENTE como YYYY-MM-DD.\n"
-                       "Aceite formatos como:\n"
-                       "- '20/10/2000' -> '2000-10-20'\n"
-                       "- '2000-10-20' -> '2000-10-20' (já está correto)\n"
-                       "- '20 de outubro de 2000' -> '2000-10-20'\n"
-                       "- '10-05-90' -> '1990-05-10'\n"
-                       "Se não encontrar uma data válida, retorne 'INVALID'."),
-            ("user", "{input}")
-        ])
-
-        chain = extract_dob_prompt | structured_llm
-        result = chain.invoke({"input": last_message})
+        result = await classify(get_chain(DATE_CHAIN), DateTurn, "v1", {"input": last_message})
+
+        if merge_exit_intent(exit_rule, result.is_exit):
+            return exit_response()
+
         dob_input = result.date or "INVALID"
 
     if dob_input == "INVALID":
@@ -137,7 +167,7 @@ def handle_dob_collection(last_message: str, temp_cpf: str, auth_attempts: int):
             "active_agent": "triage"
         }
 
-    user = authenticate_user(temp_cpf, dob_input)
+    user = await asyncio.to_thread(authenticate_user, temp_cpf, dob_input)
 
     if user:
 
@@ -174,21 +204,16 @@ def handle_dob_collection(last_message: str, temp_cpf: str, auth_attempts: int):
                 "active_agent": "triage"
             }
 
-def handle_authenticated(last_message: str):
+async def handle_authenticated(last_message: str, exit_rule: bool = None):
     """
     Roteia o usuário autenticado para o agente correto.
     """
 
-    structured_llm = llm.with_structured_output(TriageIntent)
+    result = await classify(get_chain(TRIAGE_CHAIN), TriageTurn, "v1", {"input": last_message})
 
-    route_prompt = ChatPromptTemplate.from_messages([
-        ("system", "Você é um classificador de intenções bancárias. "
-                   "As categorias são: 'CREDITO' (limite, aumento de limite), 'CAMBIO' (cotação de moedas), 'OUTROS' (saudação, ajuda geral). "),
-        ("user", "{input}")
-    ])
+    if merge_exit_intent(exit_rule, result.is_exit):
+        return exit_response()
 
-    chain = route_prompt | structured_llm
-    result = chain.invoke({"input": last_message})
     intent = result.category
 
     if intent == "CREDITO":
@@ -213,7 +238,7 @@ def handle_authenticated(last_message: str):
             "active_agent": "triage"
         }
 
-def triage_node(state):
+async def triage_node(state):
     """
     Agente de Triagem:
     Fluxo estrito:
@@ -241,28 +266,29 @@ def triage_node(state):
 
     last_message = messages[-1].content if messages else ""
 
-    if check_exit_intent(last_message):
+    exit_rule = rules_exit_intent(last_message)
 
-        return {
-            "messages": [SystemMessage(content="Atendimento finalizado com sucesso. Foi um prazer te ajudar! Se precisar de mais alguma coisa, é só mandar uma nova mensagem que eu volto a te atender. Até logo!")],
-            "next_node": "end",
-            "active_agent": "triage", 
-            "triage_step": "greeting", 
-            "temp_cpf": None
-        }
+    if exit_rule:
+        return exit_response()
     
     try:
         if triage_step == "greeting":
-            return handle_greeting(last_message)
+            with llm_priority_scope(PRIORITY_LOW):
+                return await handle_greeting(last_message, exit_rule)
 
         elif triage_step == "collect_cpf":
-            return handle_cpf_collection(last_message)
+            with llm_priority_scope(PRIORITY_AUTH):
+                return await handle_cpf_collection(last_message, exit_rule)
 
         elif triage_step == "collect_dob":
-            return handle_dob_collection(last_message, temp_cpf, auth_attempts)
+            with llm_priority_scope(PRIORITY_AUTH):
+                return await handle_dob_collection(last_message, temp_cpf, auth_attempts, exit_rule)
 
         elif triage_step == "authenticated":
-            return handle_authenticated(last_message)
+            return await handle_authenticated(last_message, exit_rule)
+
+        if exit_rule is None and await check_exit_intent(last_message):
+            return exit_response()
         
         return {
             "messages": [SystemMessage(content="Desculpe, me perdi. Vamos começar de novo? Digite seu CPF.")],
@@ -274,7 +300,7 @@ def triage_node(state):
     except Exception as e:
 
         print(f"Error in triage agent: {e}")
-        error_msg = generate_error_response(str(e))
+        error_msg = await generate_error_response(str(e))
         
         return {
             "messages": [SystemMessage(content=error_msg)],
@@ -1,29 +1,103 @@
-from langchain_core.prompts import ChatPromptTemplate
+import threading
+from collections import Counter
+from typing import NamedTuple, Optional
 
-from app.core.llm import llm
+from app.core.chains import get_chain, register_chain
+from app.core.classifier_cache import classify
+from app.core.exit_rules import match_exit_rules
 from app.models.schemas import ExitIntent
 
-def check_exit_intent(message: str) -> bool:
+EXIT_INSTRUCTION = ("\n\nAlém disso, preencha 'is_exit' com True se o usuário deseja ENCERRAR, FINALIZAR, SAIR ou PARAR a conversa "
+                    "(ex: 'não obrigado', 'deixa pra lá', 'já resolvi', 'não quero nada', 'tchau', 'fim', 'sair', 'finalizar'). "
+                    "Continuações, dúvidas ou respostas a perguntas são False.")
+
+EXIT_CHAIN = register_chain("exit_intent", [
+    ("system", "Você é um classificador de intenção. Analise a mensagem do usuário e determine se ele deseja ENCERRAR, FINALIZAR, SAIR ou PARAR a conversa.\n"
+               "Frases como 'não obrigado', 'deixa pra lá', 'já resolvi', 'não quero nada', 'tchau', 'fim', 'sair', 'finalizar' devem ser consideradas SAÍDA (True).\n"
+               "Frases de continuação, dúvidas ou respostas a perguntas devem ser consideradas CONTINUAÇÃO (False)."),
+    ("user", "{input}")
+], ExitIntent)
+
+class ExitDecision(NamedTuple):
+    """Resultado do detector de saída e o estágio que decidiu ('rules', 'combined', 'llm' ou 'fallback')."""
+
+    is_exit: bool
+    tier: str
+
+_exit_stats = Counter()
+_exit_stats_lock = threading.Lock()
+
+def _record_exit_tier(tier: str):
+    with _exit_stats_lock:
+        _exit_stats[tier] += 1
+
+def get_exit_stats() -> dict:
+    """Contadores por estágio do detector de saída e a taxa de mensagens decididas sem uma chamada de LLM dedicada."""
+
+    with _exit_stats_lock:
+        stats = dict(_exit_stats)
+
+    total = sum(stats.values())
+    stats["total"] = total
+    stats["llm_bypass_rate"] = 1 - (stats.get("llm", 0) + stats.get("fallback", 0)) / total if total else 0.0
+
+    return stats
+
+def rules_exit_intent(message: str) -> Optional[bool]:
+    """
+    Estágio de regras do detector de saída.
+    Retorna True/False para os casos óbvios e None para os ambíguos.
+    """
+
+    decision = match_exit_rules(message)
+
+    if decision is not None:
+        _record_exit_tier("rules")
+
+    return decision
+
+def merge_exit_intent(rule_decision: Optional[bool], llm_is_exit: bool) -> bool:
     """
-    Usa LLM para determinar se o usuário deseja sair da conversa.
+    Combina a decisão das regras com o campo `is_exit` devolvido por um
+    classificador combinado (ver EXIT_INSTRUCTION). As regras têm precedência
+    quando decidem.
     """
 
+    if rule_decision is not None:
+        return rule_decision
+
+    _record_exit_tier("combined")
+
+    return bool(llm_is_exit)
+
+async def detect_exit_intent(message: str) -> ExitDecision:
+    """
+    Detector de saída em estágios: regras léxicas decidem os casos óbvios
+    (tchau, sair, números, datas, CPFs) e só as mensagens ambíguas vão para o LLM.
+    """
+
+    decision = rules_exit_intent(message)
+
+    if decision is not None:
+        return ExitDecision(decision, "rules")
+
     try:
-        structured_llm = llm.with_structured_output(ExitIntent)
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", "Você é um classificador de intenção. Analise a mensagem do usuário e determine se ele deseja ENCERRAR, FINALIZAR, SAIR ou PARAR a conversa.\n"
-                       "Frases como 'não obrigado', 'deixa pra lá', 'já resolvi', 'não quero nada', 'tchau', 'fim', 'sair', 'finalizar' devem ser consideradas SAÍDA (True).\n"
-                       "Frases de continuação, dúvidas ou respostas a perguntas devem ser consideradas CONTINUAÇÃO (False)."),
-            ("user", "{input}")
-        ])
-
-        chain = prompt | structured_llm
-        result = chain.invoke({"input": message})
-
-        return result.is_exit
-        
+        result = await classify(get_chain(EXIT_CHAIN), ExitIntent, "v1", {"input": message})
+
+        _record_exit_tier("llm")
+
+        return ExitDecision(result.is_exit, "llm")
+
     except Exception as e:
 
         print(f"Error checking exit intent: {e}")
-        
-        return False
+        _record_exit_tier("fallback")
+
+        return ExitDecision(False, "fallback")
+
+async def check_exit_intent(message: str) -> bool:
+    """
+    Determina se o usuário deseja sair da conversa.
+    """
+
+    return (await detect_exit_intent(message)).is_exit
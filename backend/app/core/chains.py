@@ -0,0 +1,73 @@
+import os
+import threading
+from langchain_core.prompts import ChatPromptTemplate
+from app.core import llm as llm_module
+from app.core.micro_batcher import MicroBatcher
+
+
+# Janela de agrupamento das chains estruturadas (0 desativa o micro-batching).
+# Só vale com tráfego: sem outra chamada pendente ou em andamento, o envio é imediato.
+MICROBATCH_WINDOW_MS = float(os.getenv("MICROBATCH_WINDOW_MS", "10"))
+MICROBATCH_MAX_SIZE = int(os.getenv("MICROBATCH_MAX_SIZE", "16"))
+
+_specs = {}
+_chains = {}
+_batchers = {}
+_lock = threading.Lock()
+
+def register_chain(name: str, messages, schema=None):
+    """
+    Registra um prompt (e, opcionalmente, o schema de saída estruturada).
+    A chain `prompt | llm` correspondente é montada uma única vez, na primeira
+    chamada a `get_chain` ou no `warm_up` da inicialização, com o LLM passando
+    pelo limitador de concorrência (`llm_module.llm_limiter`).
+    Chains estruturadas recebem a tag "nostream" para que seus tokens não
+    apareçam no streaming de respostas ao usuário, e passam por um
+    MicroBatcher que junta as chamadas simultâneas de várias sessões.
+    """
+
+    _specs[name] = (ChatPromptTemplate.from_messages(messages), schema)
+
+    return name
+
+def _build(name: str):
+    prompt, schema = _specs[name]
+    llm = llm_module.llm
+    limiter = llm_module.llm_limiter
+
+    if schema is not None:
+        chain = (prompt | limiter.wrap(llm.with_structured_output(schema))).with_config(tags=["nostream"])
+
+        if MICROBATCH_WINDOW_MS > 0:
+            chain = _batchers[name] = MicroBatcher(chain, MICROBATCH_WINDOW_MS / 1000, MICROBATCH_MAX_SIZE)
+
+        return chain
+
+    return prompt | limiter.wrap(llm)
+
+def get_chain(name: str):
+    """Retorna a chain registrada com o nome informado, montando-a se necessário."""
+
+    chain = _chains.get(name)
+
+    if chain is None:
+        with _lock:
+            chain = _chains.get(name)
+
+            if chain is None:
+                chain = _chains[name] = _build(name)
+
+    return chain
+
+def warm_up():
+    """Monta todas as chains registradas."""
+
+    for name in list(_specs):
+        get_chain(name)
+
+    return len(_chains)
+
+def batch_stats() -> dict:
+    """Métricas de micro-batching por chain estruturada."""
+
+    return {name: batcher.stats() for name, batcher in _batchers.items()}
@@ -0,0 +1,181 @@
+import os
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from langgraph.checkpoint.memory import MemorySaver
+
+
+CHECKPOINTER = os.getenv("CHECKPOINTER", "memory")
+CHECKPOINT_DB_PATH = os.getenv("CHECKPOINT_DB_PATH", os.path.join(os.path.dirname(__file__), "..", "data", "checkpoints.db"))
+
+def _idle_seconds(ts: str) -> float:
+    """Segundos desde o horário (ISO) gravado no checkpoint."""
+
+    try:
+        return max(0.0, (datetime.now(timezone.utc) - datetime.fromisoformat(ts)).total_seconds())
+
+    except (TypeError, ValueError):
+        return 0.0
+
+class LatestMemorySaver(MemorySaver):
+    """
+    MemorySaver que, com `aprune`, guarda só o último checkpoint de cada
+    conversa. O grafo não usa histórico de checkpoints (time travel), e sem
+    poda cada turno deixaria um checkpoint e novos blobs na memória.
+    """
+
+    def prune(self, thread_ids, *, strategy: str = "keep_latest"):
+        for thread_id in thread_ids:
+            if strategy == "delete":
+                self.delete_thread(thread_id)
+                continue
+
+            for checkpoint_ns, checkpoints in self.storage.get(thread_id, {}).items():
+                if len(checkpoints) < 2:
+                    continue
+
+                latest = max(checkpoints)
+                kept = self.serde.loads_typed(checkpoints[latest][0])["channel_versions"]
+
+                for checkpoint_id in [c for c in checkpoints if c != latest]:
+                    versions = self.serde.loads_typed(checkpoints.pop(checkpoint_id)[0])["channel_versions"]
+                    self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+
+                    for channel, version in versions.items():
+                        if kept.get(channel) != version:
+                            self.blobs.pop((thread_id, checkpoint_ns, channel, version), None)
+
+    async def aprune(self, thread_ids, *, strategy: str = "keep_latest"):
+        self.prune(thread_ids, strategy=strategy)
+
+    async def athread_size(self, thread_id: str) -> int:
+        """Bytes serializados guardados para a conversa (checkpoints, blobs e writes)."""
+
+        size = 0
+
+        for checkpoint_ns, checkpoints in self.storage.get(thread_id, {}).items():
+            for checkpoint_id, (checkpoint, metadata, _) in checkpoints.items():
+                size += len(checkpoint[1]) + len(metadata[1])
+
+                for _, _, value, _ in self.writes.get((thread_id, checkpoint_ns, checkpoint_id), {}).values():
+                    size += len(value[1])
+
+                for channel, version in self.serde.loads_typed(checkpoint)["channel_versions"].items():
+                    blob = self.blobs.get((thread_id, checkpoint_ns, channel, version))
+
+                    if blob is not None:
+                        size += len(blob[1])
+
+        return size
+
+    async def athreads(self):
+        """Conversas guardadas: lista de (thread_id, segundos parada, bytes)."""
+
+        threads = []
+
+        for thread_id in list(self.storage):
+            latest = self.get_tuple({"configurable": {"thread_id": thread_id}})
+
+            if latest is not None:
+                threads.append((thread_id, _idle_seconds(latest.checkpoint["ts"]), await self.athread_size(thread_id)))
+
+        return threads
+
+def _sqlite_saver_class():
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+    class LatestSqliteSaver(AsyncSqliteSaver):
+        """AsyncSqliteSaver com `aprune` mantendo só o último checkpoint da conversa."""
+
+        async def aprune(self, thread_ids, *, strategy: str = "keep_latest"):
+            if strategy == "delete":
+                for thread_id in thread_ids:
+                    await self.adelete_thread(thread_id)
+
+                return
+
+            await self.setup()
+
+            async with self.lock, self.conn.cursor() as cur:
+                for thread_id in thread_ids:
+                    await cur.execute(
+                        "DELETE FROM checkpoints WHERE thread_id = ? AND (checkpoint_ns, checkpoint_id) NOT IN "
+                        "(SELECT checkpoint_ns, MAX(checkpoint_id) FROM checkpoints WHERE thread_id = ? GROUP BY checkpoint_ns)",
+                        (str(thread_id), str(thread_id))
+                    )
+                    await cur.execute(
+                        "DELETE FROM writes WHERE thread_id = ? AND (checkpoint_ns, checkpoint_id) NOT IN "
+                        "(SELECT checkpoint_ns, checkpoint_id FROM checkpoints WHERE thread_id = ?)",
+                        (str(thread_id), str(thread_id))
+                    )
+
+                await self.conn.commit()
+
+        async def athread_size(self, thread_id: str) -> int:
+            await self.setup()
+
+            async with self.lock, self.conn.cursor() as cur:
+                await cur.execute(
+                    "SELECT COALESCE(SUM(LENGTH(checkpoint) + LENGTH(metadata)), 0) FROM checkpoints WHERE thread_id = ?",
+                    (str(thread_id),)
+                )
+                checkpoints = (await cur.fetchone())[0]
+
+                await cur.execute("SELECT COALESCE(SUM(LENGTH(value)), 0) FROM writes WHERE thread_id = ?", (str(thread_id),))
+                writes = (await cur.fetchone())[0]
+
+            return checkpoints + writes
+
+        async def athreads(self):
+            await self.setup()
+
+            async with self.lock, self.conn.cursor() as cur:
+                await cur.execute("SELECT DISTINCT thread_id FROM checkpoints")
+                thread_ids = [row[0] for row in await cur.fetchall()]
+
+            threads = []
+
+            for thread_id in thread_ids:
+                latest = await self.aget_tuple({"configurable": {"thread_id": thread_id}})
+
+                if latest is not None:
+                    threads.append((thread_id, _idle_seconds(latest.checkpoint["ts"]), await self.athread_size(thread_id)))
+
+            return threads
+
+    return LatestSqliteSaver
+
+@asynccontextmanager
+async def open_checkpointer(backend: str = CHECKPOINTER):
+    """
+    Abre o checkpointer que guarda o estado das conversas (thread_id = session_id).
+
+    - `memory`: estado em memória, perdido ao reiniciar o servidor.
+    - `sqlite`: estado persistido em CHECKPOINT_DB_PATH (requer langgraph-checkpoint-sqlite).
+
+    Os dois guardam só o último checkpoint de cada conversa quando
+    `compact_thread` é chamado ao fim do turno.
+    """
+
+    if backend == "sqlite":
+        async with _sqlite_saver_class().from_conn_string(CHECKPOINT_DB_PATH) as saver:
+            yield saver
+
+        return
+
+    if backend != "memory":
+        raise ValueError(f"Unknown checkpointer: {backend}")
+
+    yield LatestMemorySaver()
+
+async def compact_thread(checkpointer, session_id: str) -> int:
+    """
+    Descarta os checkpoints antigos da conversa e retorna quantos bytes
+    continuam guardados para ela no checkpointer.
+    """
+
+    await checkpointer.aprune([session_id])
+
+    return await checkpointer.athread_size(session_id)
+
+def thread_config(session_id: str) -> dict:
+    return {"configurable": {"thread_id": session_id}}
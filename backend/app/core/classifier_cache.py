@@ -0,0 +1,97 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from app.core.exit_rules import normalize_text
+
+
+class ClassificationCache:
+    """
+    Cache LRU com TTL para resultados de classificadores estruturados.
+
+    A chave é (schema, versão do prompt, entradas normalizadas), de modo que
+    mensagens repetidas como "sim", "oi" ou "cotação do dólar" não geram
+    novas chamadas ao LLM. Mudar o texto de um prompt exige mudar sua versão.
+    """
+
+    def __init__(self, maxsize: int = 2048, ttl: float = 600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(schema, prompt_version: str, inputs: dict):
+        return (schema.__name__, prompt_version, tuple((k, normalize_text(str(v))) for k, v in sorted(inputs.items())))
+
+    def get(self, key):
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._data.get(key)
+
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._data[key]
+
+                self.misses += 1
+
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+classifier_cache = ClassificationCache(
+    maxsize=int(os.getenv("CLASSIFIER_CACHE_SIZE", "2048")),
+    ttl=float(os.getenv("CLASSIFIER_CACHE_TTL", "600"))
+)
+
+async def classify(chain, schema, prompt_version: str, inputs: dict, cacheable: bool = True):
+    """
+    Invoca um classificador estruturado passando pelo cache compartilhado.
+    Use `cacheable=False` para prompts com contexto específico do usuário.
+    """
+
+    if not cacheable:
+        return await chain.ainvoke(inputs)
+
+    key = ClassificationCache.make_key(schema, prompt_version, inputs)
+    result = classifier_cache.get(key)
+
+    if result is None:
+        result = await chain.ainvoke(inputs)
+        classifier_cache.set(key, result)
+
+    return result
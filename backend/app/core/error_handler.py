@@ -1,23 +1,21 @@
-from langchain_core.prompts import ChatPromptTemplate
-from app.core.llm import llm
+from app.core.chains import get_chain, register_chain
 
-def generate_error_response(error_details: str) -> str:
+ERROR_RESPONSE_CHAIN = register_chain("error_response", [
+    ("system", "Você é um assistente bancário virtual prestativo e educado. Ocorreu um erro interno no sistema: {error_details}.\n"
+               "Seu objetivo é explicar ao usuário, de forma humana e não técnica, que algo deu errado do nosso lado.\n"
+               "Peça desculpas pelo inconveniente e sugira que ele aguarde um momento ou tente atualizar a página para reiniciar o atendimento.\n"
+               "IMPORTANTE: Avise que ao reiniciar, será necessário passar pelo processo de autenticação novamente.\n"
+               "Não mencione códigos de erro ou detalhes técnicos. Mantenha a calma e a empatia."),
+    ("user", "Gere a mensagem de erro.")
+])
+
+async def generate_error_response(error_details: str) -> str:
     """
     Gera uma mensagem de erro amigável usando LLM para manter a persona do atendente.
     """
 
     try:
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", "Você é um assistente bancário virtual prestativo e educado. Ocorreu um erro interno no sistema: {error_details}.\n"
-                       "Seu objetivo é explicar ao usuário, de forma humana e não técnica, que algo deu errado do nosso lado.\n"
-                       "Peça desculpas pelo inconveniente e sugira que ele aguarde um momento ou tente atualizar a página para reiniciar o atendimento.\n"
-                       "IMPORTANTE: Avise que ao reiniciar, será necessário passar pelo processo de autenticação novamente.\n"
-                       "Não mencione códigos de erro ou detalhes técnicos. Mantenha a calma e a empatia."),
-            ("user", "Gere a mensagem de erro.")
-        ])
-
-        chain = prompt | llm
-        response = chain.invoke({"error_details": error_details})
+        response = await get_chain(ERROR_RESPONSE_CHAIN).ainvoke({"error_details": error_details})
 
         return response.content
 
@@ -0,0 +1,84 @@
+import re
+import unicodedata
+from typing import Optional
+
+
+EXIT_WORDS = (
+    "tchau", "tchauzinho", "xau", "sair", "finalizar", "finaliza", "encerrar", "encerra",
+    "fim", "parar", "adeus", "bye", "flw", "falou"
+)
+
+EXIT_PHRASES = (
+    "ate logo", "ate mais", "ate a proxima", "nao obrigado", "nao obrigada", "deixa pra la",
+    "deixa para la", "ja resolvi", "nao quero nada", "nao preciso de mais nada",
+    "so isso", "era so isso", "e so isso", "pode encerrar", "pode finalizar", "quero sair"
+)
+
+FILLER_WORDS = (
+    "ok", "okay", "entao", "obrigado", "obrigada", "brigado", "valeu", "muito", "por", "favor",
+    "pode", "quero", "vou", "o", "a", "atendimento", "conversa", "chat", "agora", "e", "isso"
+)
+
+CONTINUE_WORDS = (
+    "oi", "ola", "sim", "claro", "bora", "ok", "okay", "beleza", "blz", "quero", "formal", "clt",
+    "autonomo", "autonoma", "desempregado", "desempregada", "freelancer", "pj"
+)
+
+# Saudações ("bom dia", "boa noite") ficam de fora: também são despedidas
+# ("obrigado, boa noite") e vão para o LLM.
+CONTINUE_KEYWORDS = (
+    "limite", "credito", "aumento", "aumentar", "cotacao", "cambio", "dolar", "euro", "libra",
+    "moeda", "entrevista", "score", "renda", "salario", "ganho", "despesa", "dependente",
+    "divida", "cpf", "nascimento"
+)
+
+NUMERIC_PATTERN = re.compile(r"^(r\$)?[\d\s.,/\-]+(k|mil|reais)?$")
+
+TEXT_DATE_PATTERN = re.compile(r"^\d{1,2} de [a-z]+ de \d{2,4}$")
+
+def normalize_text(text: str) -> str:
+    """Minúsculas, sem acentos, sem pontuação e com espaços simples."""
+
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[^\w\s$.,/\-]", " ", text)
+
+    return re.sub(r"\s+", " ", text).strip()
+
+def match_exit_rules(message: str) -> Optional[bool]:
+    """
+    Estágio determinístico do detector de saída.
+    Retorna True/False quando a mensagem é óbvia e None quando é ambígua.
+    """
+
+    text = normalize_text(message)
+
+    if not text:
+        return False
+
+    if NUMERIC_PATTERN.match(text) or TEXT_DATE_PATTERN.match(text):
+        return False
+
+    words = re.sub(r"[$.,/\-]", " ", text).split()
+    plain = " ".join(words)
+
+    has_exit_word = any(w in EXIT_WORDS for w in words)
+    has_exit_phrase = any(re.search(rf"\b{p}\b", plain) for p in EXIT_PHRASES)
+
+    if has_exit_word or has_exit_phrase:
+        remaining = plain
+
+        for p in sorted(EXIT_PHRASES, key=len, reverse=True):
+            remaining = re.sub(rf"\b{p}\b", " ", remaining)
+
+        leftover = [w for w in remaining.split() if w not in EXIT_WORDS and w not in FILLER_WORDS]
+
+        return True if not leftover else None
+
+    if len(words) <= 3 and all(w in CONTINUE_WORDS or w.isdigit() for w in words):
+        return False
+
+    if "nao" not in words and any(re.search(rf"\b{k}", plain) for k in CONTINUE_KEYWORDS):
+        return False
+
+    return None
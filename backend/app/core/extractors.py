@@ -0,0 +1,115 @@
+import os
+import re
+from datetime import date
+from typing import Optional
+from app.core.exit_rules import normalize_text
+
+
+CPF_STRICT = os.getenv("CPF_STRICT", "false").lower() in ("1", "true", "sim", "yes")
+
+CPF_PATTERN = re.compile(r"(?<!\d)(\d{3})[.\s]?(\d{3})[.\s]?(\d{3})[-.\s]?(\d{2})(?!\d)")
+
+MONTHS = {
+    "janeiro": 1, "jan": 1, "fevereiro": 2, "fev": 2, "marco": 3, "mar": 3, "abril": 4, "abr": 4,
+    "maio": 5, "mai": 5, "junho": 6, "jun": 6, "julho": 7, "jul": 7, "agosto": 8, "ago": 8,
+    "setembro": 9, "set": 9, "outubro": 10, "out": 10, "novembro": 11, "nov": 11, "dezembro": 12, "dez": 12
+}
+
+ISO_DATE_PATTERN = re.compile(r"(?<!\d)(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})(?!\d)")
+
+NUMERIC_DATE_PATTERN = re.compile(r"(?<!\d)(\d{1,2})[-/.](\d{1,2})[-/.](\d{4}|\d{2})(?!\d)")
+
+TEXT_DATE_PATTERN = re.compile(r"(?<!\d)(\d{1,2})(?:º|o)?\s+(?:de\s+)?([a-z]+)\.?\s+(?:de\s+)?(\d{4}|\d{2})(?!\d)")
+
+COMPACT_DATE_PATTERN = re.compile(r"^(\d{2})(\d{2})(\d{4})$")
+
+def is_valid_cpf(cpf: str) -> bool:
+    """Valida os dois dígitos verificadores do CPF (11 dígitos, sem pontuação)."""
+
+    if len(cpf) != 11 or not cpf.isdigit() or cpf == cpf[0] * 11:
+        return False
+
+    for size in (9, 10):
+        total = sum(int(digit) * weight for digit, weight in zip(cpf[:size], range(size + 1, 1, -1)))
+        check = (total * 10) % 11 % 10
+
+        if check != int(cpf[size]):
+            return False
+
+    return True
+
+def extract_cpf(message: str) -> Optional[str]:
+    """
+    Extrai um CPF da mensagem sem usar o LLM. Aceita '12345678900',
+    '123.456.789-00' e variações com espaços.
+
+    Retorna os 11 dígitos, ou None se não houver exatamente um candidato.
+    A validação dos dígitos verificadores fica a cargo de `is_valid_cpf`.
+    """
+
+    candidates = {"".join(match.groups()) for match in CPF_PATTERN.finditer(message)}
+
+    if len(candidates) != 1:
+        return None
+
+    return candidates.pop()
+
+def _expand_year(year: str) -> int:
+    """Anos com dois dígitos: acima do ano corrente vão para 1900, os demais para 2000."""
+
+    if len(year) == 4:
+        return int(year)
+
+    current = date.today().year
+
+    return 2000 + int(year) if int(year) <= current % 100 else 1900 + int(year)
+
+def _to_iso(year: int, month: int, day: int) -> Optional[str]:
+    try:
+        parsed = date(year, month, day)
+
+    except ValueError:
+        return None
+
+    if parsed > date.today() or parsed.year < 1900:
+        return None
+
+    return parsed.isoformat()
+
+def parse_birth_date(message: str) -> Optional[str]:
+    """
+    Interpreta uma data de nascimento em português sem usar o LLM e retorna YYYY-MM-DD.
+
+    Formatos aceitos:
+    - '2000-10-20', '2000/10/20'
+    - '20/10/2000', '20-10-2000', '20.10.2000', '20/10/00'
+    - '20 de outubro de 2000', '20 out 2000', '1º de março de 90'
+    - '20102000'
+
+    Retorna None quando não há data, há mais de uma ou ela é inválida.
+    """
+
+    text = normalize_text(message)
+    dates = set()
+
+    for year, month, day in ISO_DATE_PATTERN.findall(text):
+        dates.add(_to_iso(int(year), int(month), int(day)))
+
+    if not dates:
+        for day, month, year in NUMERIC_DATE_PATTERN.findall(text):
+            dates.add(_to_iso(_expand_year(year), int(month), int(day)))
+
+    for day, month_name, year in TEXT_DATE_PATTERN.findall(text):
+        if month_name in MONTHS:
+            dates.add(_to_iso(_expand_year(year), MONTHS[month_name], int(day)))
+
+    compact = COMPACT_DATE_PATTERN.match(text)
+
+    if compact:
+        day, month, year = compact.groups()
+        dates.add(_to_iso(int(year), int(month), int(day)))
+
+    if len(dates) != 1:
+        return None
+
+    return dates.pop()
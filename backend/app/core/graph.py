@@ -1,5 +1,6 @@
 from typing import Annotated, TypedDict, List, Dict, Any
 from langgraph.graph import StateGraph, END
+from app.core.checkpointer import LatestMemorySaver
 from langchain_core.messages import BaseMessage
 import operator
 from app.agents.triage import triage_node
@@ -73,4 +74,12 @@ workflow.add_conditional_edges(
     }
 )
 
-app_graph = workflow.compile()
+def compile_graph(checkpointer=None):
+    """
+    Compila o grafo com o checkpointer informado. Com checkpointer, cada turno
+    recebe apenas a nova mensagem e o estado é recuperado pelo thread_id.
+    """
+
+    return workflow.compile(checkpointer=checkpointer)
+
+app_graph = compile_graph(LatestMemorySaver())
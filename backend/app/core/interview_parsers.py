@@ -0,0 +1,191 @@
+import re
+from typing import Optional
+from app.core.exit_rules import normalize_text
+
+
+MONEY_PATTERN = re.compile(r"(?<![\d.,])(\d[\d.,]*)\s*(k|mil)?\b")
+
+ZERO_WORDS = ("zero", "nada", "nenhum", "nenhuma")
+
+NUMBER_WORDS = {
+    "zero": 0, "nenhum": 0, "nenhuma": 0, "um": 1, "uma": 1, "dois": 2, "duas": 2, "tres": 3,
+    "quatro": 4, "cinco": 5, "seis": 6, "sete": 7, "oito": 8, "nove": 9, "dez": 10
+}
+
+JOB_SYNONYMS = {
+    "formal": (
+        "formal", "clt", "carteira assinada", "registrado", "registrada", "funcionario publico",
+        "funcionaria publica", "servidor publico", "servidora publica", "concursado", "concursada",
+        "assalariado", "assalariada"
+    ),
+    "autônomo": (
+        "autonomo", "autonoma", "pj", "freelancer", "freela", "mei", "empresario", "empresaria",
+        "conta propria", "por conta", "profissional liberal", "informal"
+    ),
+    "desempregado": (
+        "desempregado", "desempregada", "sem emprego", "sem trabalho", "nao trabalho",
+        "nao estou trabalhando", "to parado", "estou parado", "estou parada"
+    )
+}
+
+YES_WORDS = ("sim", "s", "claro", "uhum", "aham", "yes", "tenho", "possuo")
+
+NO_WORDS = ("nao", "n", "nenhuma", "nenhum", "nunca", "negativo", "no", "sem")
+
+# Palavras que podem acompanhar um sim/não sem mudar o sentido da resposta.
+# Respostas com qualquer outra palavra ("não sei", "não quero continuar")
+# ficam para o LLM, que também detecta a intenção de sair.
+DEBT_FILLER_WORDS = (
+    "eu", "tenho", "possuo", "um", "uma", "uns", "umas", "alguns", "algumas", "divida", "dividas", "ativa", "ativas",
+    "emprestimo", "emprestimos", "financiamento", "financiamentos"
+)
+
+DEPENDENT_FILLER_WORDS = (
+    "eu", "tenho", "possuo", "so", "apenas", "somente", "dependente", "dependentes", "filho", "filhos", "filha", "filhas"
+)
+
+# Palavras que podem acompanhar um valor ('ganho uns 4 mil por mês'). Um
+# número com qualquer outra palavra ('1 salário mínimo', 'trabalho 8 horas')
+# fica para o LLM.
+MONEY_FILLER_WORDS = (
+    "eu", "ganho", "recebo", "gasto", "pago", "uns", "umas", "cerca", "de", "mais", "ou", "menos", "quase",
+    "aproximadamente", "em", "media", "reais", "real", "por", "mes", "mensal", "mensais", "mensalmente",
+    "liquido", "liquidos", "bruto", "brutos"
+)
+
+def _has_phrase(text: str, phrase: str) -> bool:
+    return re.search(rf"\b{re.escape(phrase)}\b", text) is not None
+
+def _words(answer: str) -> list:
+    return normalize_text(answer).replace(",", " ").replace(".", " ").split()
+
+def _is_whole_answer(words, markers, fillers) -> bool:
+    """A resposta inteira é um dos `markers` acompanhado apenas de `fillers`."""
+
+    return bool(words) and any(word in markers for word in words) and all(word in markers or word in fillers for word in words)
+
+def _to_number(raw: str) -> Optional[float]:
+    """Converte '3.500,00', '3500.50', '1.200.000' ou '2,5' para float (convenções pt-BR)."""
+
+    if "," in raw and "." in raw:
+        decimal = "," if raw.rfind(",") > raw.rfind(".") else "."
+        thousands = "." if decimal == "," else ","
+        raw = raw.replace(thousands, "").replace(decimal, ".")
+
+    elif "," in raw:
+        raw = raw.replace(",", ".")
+
+    elif "." in raw:
+        groups = raw.split(".")
+
+        if len(groups) > 2 or len(groups[1]) == 3:
+            if not all(len(group) == 3 for group in groups[1:]):
+                return None
+
+            raw = raw.replace(".", "")
+
+    try:
+        return float(raw)
+
+    except ValueError:
+        return None
+
+def parse_money(answer: str) -> Optional[float]:
+    """
+    Valores como '5000', 'R$ 3.500,00', '5k', '2,5 mil', 'ganho uns 4 mil'.
+    None se ambíguo ou se o número vier com palavras fora de MONEY_FILLER_WORDS.
+    """
+
+    text = normalize_text(answer)
+
+    if text in ZERO_WORDS:
+        return 0.0
+
+    matches = MONEY_PATTERN.findall(text)
+
+    if len(matches) != 1:
+        return None
+
+    rest = MONEY_PATTERN.sub(" ", text).replace("r$", " ").replace("/", " ")
+
+    if not all(word in MONEY_FILLER_WORDS for word in _words(rest)):
+        return None
+
+    raw, suffix = matches[0]
+    value = _to_number(raw.rstrip(".,"))
+
+    if value is None:
+        return None
+
+    if suffix:
+        value *= 1000
+
+    return value
+
+def parse_job_type(answer: str) -> Optional[str]:
+    """Mapeia sinônimos ('CLT', 'PJ', 'freela', 'sem emprego') para formal, autônomo ou desempregado."""
+
+    text = normalize_text(answer)
+    found = {job for job, synonyms in JOB_SYNONYMS.items() if any(_has_phrase(text, s) for s in synonyms)}
+
+    if len(found) != 1:
+        return None
+
+    return found.pop()
+
+def parse_dependents(answer: str) -> Optional[int]:
+    """
+    Quantidade de dependentes em dígitos ou por extenso ('2', 'dois filhos',
+    'nenhum', 'não tenho'). Só aceita a resposta inteira: 'um casal de filhos'
+    ou 'sou mãe de um' retornam None.
+    """
+
+    words = _words(answer)
+    numbers = [int(word) for word in words if word.isdigit()]
+    numbers += [NUMBER_WORDS[word] for word in words if word in NUMBER_WORDS]
+    others = [word for word in words if not word.isdigit() and word not in NUMBER_WORDS]
+
+    if not numbers and _is_whole_answer(words, NO_WORDS, DEPENDENT_FILLER_WORDS):
+        return 0
+
+    if len(numbers) != 1 or not all(word in DEPENDENT_FILLER_WORDS for word in others):
+        return None
+
+    return numbers[0]
+
+def parse_yes_no(answer: str) -> Optional[bool]:
+    """
+    Respostas de sim/não sobre dívidas ('sim', 'tenho', 'não', 'não tenho',
+    'nenhuma'). Só aceita a resposta inteira; o resto ('não sei', 'não
+    quero continuar') retorna None.
+    """
+
+    words = _words(answer)
+
+    if _is_whole_answer(words, NO_WORDS, DEBT_FILLER_WORDS):
+        return False
+
+    if _is_whole_answer(words, YES_WORDS, DEBT_FILLER_WORDS):
+        return True
+
+    return None
+
+# Um parser por pergunta da entrevista, na mesma ordem de QUESTIONS,
+# com o campo correspondente em InterviewNormalization.
+ANSWER_PARSERS = (
+    ("income", parse_money),
+    ("job_type", parse_job_type),
+    ("expenses", parse_money),
+    ("dependents", parse_dependents),
+    ("has_debts", parse_yes_no)
+)
+
+def parse_answer(step: int, answer: str):
+    """
+    Interpreta a resposta da pergunta `step` (começando em 0) sem usar o LLM.
+    Retorna (campo, valor), com valor None quando a resposta não foi reconhecida.
+    """
+
+    field, parser = ANSWER_PARSERS[step]
+
+    return field, parser(answer)
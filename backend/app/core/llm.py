@@ -1,7 +1,17 @@
 from langchain_google_genai import ChatGoogleGenerativeAI
 from dotenv import load_dotenv
+from app.core.llm_limiter import AdaptiveLimiter
 import os
-
 load_dotenv()
 
-llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash-lite", temperature=0)
+# max_retries=1 desliga as retentativas do SDK: quem repete é o llm_limiter.
+llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash-lite", temperature=0, max_retries=1)
+
+llm_limiter = AdaptiveLimiter(
+    initial=int(os.getenv("LLM_CONCURRENCY", "8")),
+    min_limit=int(os.getenv("LLM_CONCURRENCY_MIN", "1")),
+    max_limit=int(os.getenv("LLM_CONCURRENCY_MAX", "32")),
+    max_retries=int(os.getenv("LLM_MAX_RETRIES", "4")),
+    base_delay=float(os.getenv("LLM_BACKOFF_BASE", "0.5")),
+    max_delay=float(os.getenv("LLM_BACKOFF_MAX", "8"))
+)
@@ -0,0 +1,212 @@
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from langchain_core.runnables import RunnableLambda
+
+
+# Prioridade das chamadas ao LLM: valores menores são atendidos primeiro.
+PRIORITY_AUTH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+llm_priority = ContextVar("llm_priority", default=PRIORITY_NORMAL)
+
+RETRYABLE_STATUS = (408, 429)
+
+@contextmanager
+def llm_priority_scope(priority: int):
+    """Define a prioridade das chamadas ao LLM feitas dentro do bloco."""
+
+    token = llm_priority.set(priority)
+
+    try:
+        yield
+
+    finally:
+        llm_priority.reset(token)
+
+def status_code(error: BaseException):
+    """Código HTTP de um erro do provedor (ou da sua causa), se houver."""
+
+    while error is not None:
+        for attr in ("code", "status_code"):
+            code = getattr(error, attr, None)
+
+            if isinstance(code, int):
+                return code
+
+        response = getattr(error, "response", None)
+        code = getattr(response, "status_code", None)
+
+        if isinstance(code, int):
+            return code
+
+        error = error.__cause__
+
+    return None
+
+def is_retryable(error: BaseException) -> bool:
+    """Erros de limite de taxa (429), timeout (408) e falhas do servidor (5xx)."""
+
+    code = status_code(error)
+
+    return code is not None and (code in RETRYABLE_STATUS or 500 <= code < 600)
+
+class AdaptiveLimiter:
+    """
+    Limite de concorrência adaptativo (AIMD) para as chamadas ao LLM.
+
+    Cada sucesso aumenta o limite em 1/limite (cerca de +1 a cada `limite`
+    respostas) e cada 429/5xx o multiplica por `decrease`, no máximo uma vez
+    por `base_delay` para que uma rajada de erros não derrube o limite a zero.
+    Chamadas acima do limite esperam numa fila por prioridade (`llm_priority`)
+    e as que falham com erro transitório são repetidas com backoff exponencial
+    com jitter.
+    """
+
+    def __init__(self, initial: int = 8, min_limit: int = 1, max_limit: int = 32, decrease: float = 0.5,
+                 max_retries: int = 4, base_delay: float = 0.5, max_delay: float = 8.0):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease = decrease
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.in_flight = 0
+        self._waiters = []
+        self._seq = itertools.count()
+        self._last_decrease = 0.0
+        self.calls = 0
+        self.queued = 0
+        self.retries = 0
+        self.throttled = 0
+        self.failures = 0
+        self.max_in_flight = 0
+        self._total_wait = 0.0
+
+    def _grant(self):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def _wake(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            _, _, future = heapq.heappop(self._waiters)
+
+            if future.done():
+                continue
+
+            self._grant()
+            future.set_result(None)
+
+    async def acquire(self, priority: int = PRIORITY_NORMAL):
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self._grant()
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        started = time.monotonic()
+        self.queued += 1
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+
+        try:
+            await future
+
+        except asyncio.CancelledError:
+
+            if future.done() and not future.cancelled():
+                self.release()
+
+            raise
+
+        self._total_wait += time.monotonic() - started
+
+    def release(self):
+        self.in_flight -= 1
+        self._wake()
+
+    def on_success(self):
+        self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def on_overload(self):
+        now = time.monotonic()
+        self.throttled += 1
+
+        if now - self._last_decrease >= self.base_delay:
+            self._last_decrease = now
+            self.limit = max(self.min_limit, self.limit * self.decrease)
+
+    def backoff(self, attempt: int) -> float:
+        """Atraso antes da tentativa `attempt + 1` ("full jitter")."""
+
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    async def run(self, call, priority: int = None):
+        """
+        Executa `call()` (uma corrotina) respeitando o limite e a prioridade,
+        repetindo em erros transitórios. Outros erros sobem na primeira falha.
+        """
+
+        if priority is None:
+            priority = llm_priority.get()
+
+        self.calls += 1
+
+        for attempt in range(self.max_retries + 1):
+            await self.acquire(priority)
+
+            try:
+                result = await call()
+
+            except Exception as e:
+
+                if not is_retryable(e) or attempt == self.max_retries:
+                    self.failures += 1
+                    raise
+
+                self.on_overload()
+                self.retries += 1
+
+            else:
+                self.on_success()
+
+                return result
+
+            finally:
+                self.release()
+
+            await asyncio.sleep(self.backoff(attempt))
+
+    def wrap(self, runnable):
+        """
+        Envolve um runnable (o LLM ou `llm.with_structured_output(...)`) para
+        que as chamadas assíncronas passem pelo limitador. O `config` é
+        repassado, então callbacks de streaming continuam funcionando.
+        Chamadas síncronas não são limitadas.
+        """
+
+        def invoke(inputs, config):
+            return runnable.invoke(inputs, config)
+
+        async def ainvoke(inputs, config):
+            return await self.run(lambda: runnable.ainvoke(inputs, config))
+
+        return RunnableLambda(invoke, afunc=ainvoke, name="llm_limiter")
+
+    def stats(self) -> dict:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "waiting": sum(1 for _, _, future in self._waiters if not future.done()),
+            "max_in_flight": self.max_in_flight,
+            "calls": self.calls,
+            "queued": self.queued,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "failures": self.failures,
+            "avg_queue_ms": 1000 * self._total_wait / self.queued if self.queued else 0.0
+        }
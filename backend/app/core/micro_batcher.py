@@ -0,0 +1,143 @@
+import asyncio
+import contextvars
+import time
+from app.core.llm_limiter import llm_priority
+
+
+class MicroBatcher:
+    """
+    Agrupa chamadas `ainvoke` simultâneas de uma mesma chain.
+
+    Sem nenhum lote pendente ou em andamento, a chamada é enviada na hora,
+    sem esperar a janela. Com tráfego, as que chegam dentro de `window`
+    segundos (ou até `max_batch` itens) são enviadas juntas com `abatch`, e
+    cada resultado (ou exceção) é devolvido ao chamador correspondente.
+    Entradas idênticas a uma chamada ainda pendente ou em andamento
+    compartilham o mesmo resultado.
+
+    Os lotes rodam em um contexto vazio para que callbacks do grafo de uma
+    sessão (ex: streaming) não recebam eventos das chamadas de outras sessões;
+    só a prioridade (`llm_priority`) é levada, a mais urgente entre os chamadores.
+    """
+
+    def __init__(self, runnable, window: float = 0.01, max_batch: int = 32):
+        self.runnable = runnable
+        self.window = window
+        self.max_batch = max_batch
+        self._pending = {}
+        self._inflight = {}
+        self._loop = None
+        self._timer = None
+        self.batches = 0
+        self.requests = 0
+        self.deduplicated = 0
+        self.immediate = 0
+        self.max_batch_size = 0
+        self._total_items = 0
+        self._total_wait = 0.0
+        self.max_wait = 0.0
+
+    def __getattr__(self, name):
+        return getattr(self.runnable, name)
+
+    @staticmethod
+    def _key(inputs):
+        if isinstance(inputs, dict):
+            return tuple(sorted((k, str(v)) for k, v in inputs.items()))
+
+        return str(inputs)
+
+    async def ainvoke(self, inputs, config=None, **kwargs):
+        loop = asyncio.get_running_loop()
+
+        if config is not None or kwargs:
+            return await self.runnable.ainvoke(inputs, config, **kwargs)
+
+        if self._loop is not None and self._loop is not loop:
+            return await self.runnable.ainvoke(inputs)
+
+        key = self._key(inputs)
+        self.requests += 1
+        entry = self._pending.get(key) or self._inflight.get(key)
+
+        if entry is None:
+            entry = self._pending[key] = (inputs, loop.create_future(), time.monotonic(), llm_priority.get())
+
+            if not self._inflight and self._timer is None:
+                self.immediate += 1
+                self._flush()
+
+            elif len(self._pending) >= self.max_batch:
+                self._flush()
+
+            elif self._timer is None:
+                self._loop = loop
+                self._timer = loop.call_later(self.window, self._flush)
+
+        else:
+            self.deduplicated += 1
+
+            if key in self._pending and llm_priority.get() < entry[3]:
+                self._pending[key] = entry[:3] + (llm_priority.get(),)
+
+        return await asyncio.shield(entry[1])
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch = list(self._pending.items())
+        self._inflight.update(self._pending)
+        self._pending = {}
+        self._loop = None
+
+        if batch:
+            context = contextvars.Context()
+            context.run(llm_priority.set, min(priority for _, (_, _, _, priority) in batch))
+            context.run(asyncio.ensure_future, self._dispatch(batch))
+
+    async def _dispatch(self, batch):
+        now = time.monotonic()
+        waits = [now - started for _, (_, _, started, _) in batch]
+
+        self.batches += 1
+        self._total_items += len(batch)
+        self._total_wait += sum(waits)
+        self.max_batch_size = max(self.max_batch_size, len(batch))
+        self.max_wait = max(self.max_wait, max(waits))
+
+        try:
+            results = await self.runnable.abatch(
+                [inputs for _, (inputs, _, _, _) in batch],
+                {"max_concurrency": self.max_batch},
+                return_exceptions=True
+            )
+
+        except Exception as e:
+
+            results = [e] * len(batch)
+
+        for (key, (_, future, _, _)), result in zip(batch, results):
+            self._inflight.pop(key, None)
+
+            if future.done():
+                continue
+
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+
+            else:
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "deduplicated": self.deduplicated,
+            "immediate": self.immediate,
+            "avg_batch_size": self._total_items / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "avg_wait_ms": 1000 * self._total_wait / self._total_items if self._total_items else 0.0,
+            "max_wait_ms": 1000 * self.max_wait
+        }
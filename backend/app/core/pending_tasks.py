@@ -0,0 +1,78 @@
+import asyncio
+from collections import OrderedDict
+
+
+class PendingTasks:
+    """
+    Tarefas asyncio em segundo plano agrupadas por conversa (thread_id) e campo.
+
+    O resultado não vai para o estado do grafo (tarefas não são serializáveis):
+    o nó o recolhe num turno seguinte com `collect_done` ou `gather`. Conversas
+    abandonadas não acumulam tarefas além de `max_tasks`.
+    """
+
+    def __init__(self, max_tasks: int = 10000):
+        self.max_tasks = max_tasks
+        self._tasks = OrderedDict()
+        self.submitted = 0
+        self.dropped = 0
+
+    def submit(self, thread_id: str, field: str, coro):
+        key = (thread_id, field)
+        previous = self._tasks.pop(key, None)
+
+        if previous is not None:
+            previous.cancel()
+
+        self._tasks[key] = asyncio.ensure_future(coro)
+        self.submitted += 1
+
+        while len(self._tasks) > self.max_tasks:
+            _, task = self._tasks.popitem(last=False)
+            task.cancel()
+            self.dropped += 1
+
+    def _keys(self, thread_id: str):
+        return [key for key in self._tasks if key[0] == thread_id]
+
+    def _result(self, task):
+        if task.cancelled() or task.exception() is not None:
+            return None
+
+        return task.result()
+
+    def collect_done(self, thread_id: str) -> dict:
+        """Retorna (e remove) os resultados já prontos da conversa: campo -> valor."""
+
+        results = {}
+
+        for key in self._keys(thread_id):
+            task = self._tasks[key]
+
+            if task.done():
+                del self._tasks[key]
+                results[key[1]] = self._result(task)
+
+        return results
+
+    async def gather(self, thread_id: str) -> dict:
+        """Aguarda as tarefas pendentes da conversa e retorna todos os resultados."""
+
+        keys = self._keys(thread_id)
+        tasks = [self._tasks.pop(key) for key in keys]
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        return {key[1]: self._result(task) for key, task in zip(keys, tasks)}
+
+    def cancel(self, thread_id: str):
+        for key in self._keys(thread_id):
+            self._tasks.pop(key).cancel()
+
+    def stats(self) -> dict:
+        return {
+            "pending": sum(1 for task in self._tasks.values() if not task.done()),
+            "held": len(self._tasks),
+            "submitted": self.submitted,
+            "dropped": self.dropped
+        }
@@ -0,0 +1,175 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from langchain_core.messages import BaseMessage
+
+
+def estimate_size(obj) -> int:
+    """
+    Estimativa aproximada (em bytes) da memória ocupada por um estado de sessão.
+    Percorre dicts, listas e mensagens; não pretende ser exata, apenas comparável.
+    """
+
+    if isinstance(obj, BaseMessage):
+        return sys.getsizeof(obj) + estimate_size(obj.content)
+
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_size(k) + estimate_size(v) for k, v in obj.items())
+
+    if isinstance(obj, (list, tuple, set)):
+        return sys.getsizeof(obj) + sum(estimate_size(item) for item in obj)
+
+    return sys.getsizeof(obj)
+
+class SessionStore:
+    """
+    Controla as sessões ativas cujo estado fica no checkpointer do grafo.
+
+    - `max_sessions`: ao ultrapassar o limite, a sessão usada há mais tempo é descartada (LRU).
+    - `idle_ttl`: sessões paradas há mais de `idle_ttl` segundos são removidas por `sweep`,
+      chamado periodicamente por `run_sweeper`.
+    - `on_evict`: corrotina chamada com o id de cada sessão descartada, para apagar
+      o estado persistido (ex: `checkpointer.adelete_thread`).
+    """
+
+    def __init__(self, max_sessions: int = 10000, idle_ttl: float = 1800.0, on_evict=None):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.on_evict = on_evict
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    async def touch(self, session_id: str, state: dict = None, stored_bytes: int = 0):
+        """
+        Marca a sessão como usada agora e atualiza a estimativa de memória e o
+        tamanho do histórico. `stored_bytes` é o que o checkpointer guarda para
+        a sessão (ver `compact_thread`).
+        """
+
+        size = (estimate_size(state) if state is not None else 0) + stored_bytes
+        history = len(state.get("messages", [])) if state is not None else 0
+        evicted = []
+
+        with self._lock:
+            self._data[session_id] = (time.monotonic(), size, history)
+            self._data.move_to_end(session_id)
+
+            while len(self._data) > self.max_sessions:
+                evicted.append(self._data.popitem(last=False)[0])
+                self.evictions += 1
+
+        await self._release(evicted)
+
+    async def restore(self, sessions):
+        """
+        Recarrega as sessões já guardadas no checkpointer (ex: após reiniciar com
+        CHECKPOINTER=sqlite), para que também expirem e entrem no limite de
+        `max_sessions`. `sessions` é uma lista de (session_id, segundos parada, bytes).
+        """
+
+        now = time.monotonic()
+        evicted = []
+
+        with self._lock:
+            # Da mais recente para a mais antiga, inserindo no início: a ordem LRU
+            # fica igual à do último acesso, como espera `sweep`.
+            for session_id, idle, size in sorted(sessions, key=lambda entry: entry[1]):
+                if session_id not in self._data:
+                    self._data[session_id] = (now - idle, size, 0)
+                    self._data.move_to_end(session_id, last=False)
+
+            while len(self._data) > self.max_sessions:
+                evicted.append(self._data.popitem(last=False)[0])
+                self.evictions += 1
+
+        await self._release(evicted)
+
+    async def delete(self, session_id: str):
+        with self._lock:
+            self._data.pop(session_id, None)
+
+        await self._release([session_id])
+
+    async def sweep(self) -> int:
+        """Remove as sessões ociosas e retorna quantas foram removidas."""
+
+        deadline = time.monotonic() - self.idle_ttl
+        expired = []
+
+        with self._lock:
+            # A ordem LRU coincide com a ordem de último acesso: as ociosas estão no início.
+            while self._data:
+                session_id, entry = next(iter(self._data.items()))
+
+                if entry[0] >= deadline:
+                    break
+
+                del self._data[session_id]
+                expired.append(session_id)
+
+            self.expirations += len(expired)
+
+        await self._release(expired)
+
+        return len(expired)
+
+    async def _release(self, session_ids):
+        if self.on_evict is None:
+            return
+
+        for session_id in session_ids:
+            try:
+                await self.on_evict(session_id)
+
+            except Exception as e:
+
+                print(f"Error releasing session {session_id}: {e}")
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total_bytes = sum(entry[1] for entry in self._data.values())
+            total_history = sum(entry[2] for entry in self._data.values())
+            live = len(self._data)
+
+            return {
+                "live_sessions": live,
+                "max_sessions": self.max_sessions,
+                "idle_ttl": self.idle_ttl,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "estimated_bytes": total_bytes,
+                "avg_session_bytes": total_bytes / live if live else 0.0,
+                "history_messages": total_history,
+                "avg_history_messages": total_history / live if live else 0.0
+            }
+
+async def run_sweeper(store: SessionStore, interval: float):
+    """Tarefa de fundo que expira sessões ociosas a cada `interval` segundos."""
+
+    while True:
+        await asyncio.sleep(interval)
+
+        try:
+            removed = await store.sweep()
+
+            if removed:
+                print(f"Expired {removed} idle sessions")
+
+        except Exception as e:
+
+            print(f"Error sweeping sessions: {e}")
+
+session_store = SessionStore(
+    max_sessions=int(os.getenv("MAX_SESSIONS", "10000")),
+    idle_ttl=float(os.getenv("SESSION_IDLE_TTL", "1800"))
+)
+
+SESSION_SWEEP_INTERVAL = float(os.getenv("SESSION_SWEEP_INTERVAL", "60"))
@@ -0,0 +1,44 @@
+import os
+from datetime import datetime
+from langchain_core.messages import HumanMessage
+from app.tools.audit_log import AuditLogWriter, JsonlAuditSink
+
+
+TRANSCRIPT_LOG_PATH = os.getenv("TRANSCRIPT_LOG_PATH", "")
+
+transcript_log = AuditLogWriter(JsonlAuditSink(TRANSCRIPT_LOG_PATH)) if TRANSCRIPT_LOG_PATH else None
+
+def turn_messages(messages) -> list:
+    """Mensagens do último turno: a última mensagem do usuário e as respostas que vieram depois dela."""
+
+    for i in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[i], HumanMessage):
+            return messages[i:]
+
+    return list(messages)
+
+def record_turn(session_id: str, messages):
+    """
+    Arquiva o turno no transcript (JSON Lines em TRANSCRIPT_LOG_PATH), já que o
+    estado guarda apenas as últimas HISTORY_WINDOW mensagens. Desativado se a
+    variável não estiver definida.
+    """
+
+    if transcript_log is None:
+        return
+
+    try:
+        # Chamada no loop de eventos: com a fila cheia, descarta em vez de esperar.
+        transcript_log.write({
+            "session_id": session_id,
+            "timestamp": datetime.now().isoformat(),
+            "messages": [{"type": m.type, "content": m.content} for m in turn_messages(messages)]
+        }, timeout=0)
+
+    except Exception as e:
+
+        print(f"Error recording transcript: {e}")
+
+def close_transcript():
+    if transcript_log is not None:
+        transcript_log.close()
@@ -1,16 +1,61 @@
+import asyncio
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.core.graph import app_graph
-from langchain_core.messages import HumanMessage
+from fastapi.responses import StreamingResponse
+from app.core import graph as graph_module
+from app.core.graph import compile_graph
+from app.core.checkpointer import compact_thread, open_checkpointer, thread_config
+from langchain_core.messages import AIMessageChunk, HumanMessage
+import io
+import json
+import pandas as pd
+from pydantic import TypeAdapter, ValidationError
 import uuid
 import os
-from app.models.schemas import UserMessage
+from app.models.schemas import LimitEvaluationItem, UserMessage
 from app.core.error_handler import generate_error_response
+from app.core.agent_utils import get_exit_stats
+from app.core.classifier_cache import classifier_cache
+from app.core.transcript import close_transcript, record_turn
+from app.models.state import HISTORY_WINDOW
+from app.core.session_store import SESSION_SWEEP_INTERVAL, run_sweeper, session_store
+from app.core import chains
+from app.core import llm as llm_module
+from app.agents.interview import pending_normalizations
+from app.tools import data_tools, search_tools
 
 load_dotenv()
 
-app = FastAPI(title="Banco Ágil API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Aquece o serviço antes da primeira requisição (chains, cliente HTTP, dados
+    e checkpointer das conversas) e libera os recursos no desligamento.
+    """
+
+    chains.warm_up()
+    search_tools.open_http_client()
+    data_tools.storage.warm_up()
+
+    async with open_checkpointer() as checkpointer:
+        graph_module.app_graph = compile_graph(checkpointer)
+        session_store.on_evict = checkpointer.adelete_thread
+        await session_store.restore(await checkpointer.athreads())
+        sweeper = asyncio.create_task(run_sweeper(session_store, SESSION_SWEEP_INTERVAL))
+        rate_refresher = asyncio.create_task(search_tools.run_rate_refresher())
+
+        yield
+
+        rate_refresher.cancel()
+        sweeper.cancel()
+
+    close_transcript()
+    data_tools.storage.close()
+    await search_tools.close_http_client()
+
+app = FastAPI(title="Banco Ágil API", lifespan=lifespan)
 
 origins = os.getenv("ALLOWED_ORIGINS", "*").split(",")
 
@@ -22,37 +67,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-sessions = {}
+def turn_input(user_msg: UserMessage) -> dict:
+    """
+    Entrada de um turno: apenas a nova mensagem do usuário. O restante do estado
+    da sessão é recuperado pelo checkpointer (thread_id = session_id); numa sessão
+    nova, os agentes partem dos seus valores padrão.
+    """
+
+    return {"messages": [HumanMessage(content=user_msg.message)]}
     
 @app.post("/chat")
-def chat_endpoint(user_msg: UserMessage):
+async def chat_endpoint(user_msg: UserMessage):
     """
     Invoca o agente LangGraph.
     """
 
     session_id = user_msg.session_id
 
-    if session_id not in sessions:
-
-        sessions[session_id] = {
-            "messages": [],
-            "user_data": None,
-            "auth_attempts": 0,
-            "next_node": "triage",
-            "active_agent": "triage",
-            "interview_step": 0,
-            "interview_answers": [],
-            "triage_step": "greeting",
-            "temp_cpf": None
-        }
-
-    current_state = sessions[session_id]
-    current_state["messages"].append(HumanMessage(content=user_msg.message))
-
     try:
-        output = app_graph.invoke(current_state)
+        output = await graph_module.app_graph.ainvoke(turn_input(user_msg), thread_config(session_id), durability="exit")
 
-        sessions[session_id] = output
+        stored = await compact_thread(graph_module.app_graph.checkpointer, session_id)
+        await session_store.touch(session_id, output, stored)
+        record_turn(session_id, output["messages"])
 
         last_message = output["messages"][-1].content
 
@@ -63,8 +100,153 @@ def chat_endpoint(user_msg: UserMessage):
     except Exception as e:
 
         print(f"Error processing request: {e}")
-        error_msg = generate_error_response(str(e))
+        error_msg = await generate_error_response(str(e))
 
         return {
             "response": error_msg
-        }
\ No newline at end of file
+        }
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(user_msg: UserMessage):
+    """
+    Invoca o agente LangGraph transmitindo a resposta via Server-Sent Events.
+
+    Eventos:
+    - `delta`: trecho de texto gerado pelo LLM, enviado assim que chega.
+    - `message`: mensagem pronta (respostas fixas dos agentes), enviada de uma vez.
+    - `done`: fim do turno, com a resposta final (a mesma de /chat).
+    """
+
+    session_id = user_msg.session_id
+
+    async def event_stream():
+        streamed_nodes = set()
+        output = None
+
+        try:
+            async for mode, chunk in graph_module.app_graph.astream(
+                turn_input(user_msg), thread_config(session_id),
+                stream_mode=["messages", "updates", "values"], durability="exit"
+            ):
+
+                if mode == "messages":
+                    message_chunk, metadata = chunk
+
+                    if isinstance(message_chunk, AIMessageChunk) and isinstance(message_chunk.content, str) and message_chunk.content:
+                        streamed_nodes.add(metadata.get("langgraph_node"))
+                        yield sse_event("delta", {"content": message_chunk.content})
+
+                elif mode == "updates":
+                    for node, update in chunk.items():
+                        if node in streamed_nodes or not update:
+                            continue
+
+                        for message in update.get("messages", []):
+                            yield sse_event("message", {"content": message.content})
+
+                else:
+                    output = chunk
+
+            stored = await compact_thread(graph_module.app_graph.checkpointer, session_id)
+            await session_store.touch(session_id, output, stored)
+            record_turn(session_id, output["messages"])
+
+            yield sse_event("done", {"response": output["messages"][-1].content})
+
+        except Exception as e:
+
+            print(f"Error processing request: {e}")
+            error_msg = await generate_error_response(str(e))
+
+            yield sse_event("message", {"content": error_msg})
+            yield sse_event("done", {"response": error_msg})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+BATCH_MAX_ROWS = int(os.getenv("BATCH_MAX_ROWS", "100000"))
+
+async def read_limit_batch(request: Request) -> pd.DataFrame:
+    """
+    Lê os pedidos do corpo da requisição: um array JSON de LimitEvaluationItem
+    ou um CSV enviado como arquivo (campo `file`) com as colunas cpf e requested_limit.
+    """
+
+    content_type = request.headers.get("content-type", "")
+
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Envie o CSV no campo 'file'.")
+
+        try:
+            df = pd.read_csv(io.BytesIO(await upload.read()), dtype={"cpf": str})
+
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"CSV inválido: {e}")
+
+        missing = {"cpf", "requested_limit"} - set(df.columns)
+
+        if missing:
+            raise HTTPException(status_code=400, detail=f"Colunas ausentes no CSV: {', '.join(sorted(missing))}")
+
+        return df
+
+    try:
+        items = TypeAdapter(list[LimitEvaluationItem]).validate_json(await request.body())
+
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+
+    return pd.DataFrame([item.model_dump() for item in items], columns=["cpf", "requested_limit"])
+
+@app.post("/credit/evaluate-batch")
+async def evaluate_batch_endpoint(request: Request, dry_run: bool = True):
+    """
+    Avalia pedidos de aumento de limite em lote, sem LLM.
+
+    Aceita um array JSON [{"cpf": ..., "requested_limit": ...}] ou um CSV enviado
+    no campo `file`. Com `dry_run=true` (padrão) apenas retorna as decisões;
+    com `dry_run=false` os pedidos são registrados e os aprovados aplicados.
+    """
+
+    df = await read_limit_batch(request)
+
+    if len(df) > BATCH_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"Máximo de {BATCH_MAX_ROWS} pedidos por lote.")
+
+    result = await asyncio.to_thread(data_tools.evaluate_limit_requests, df, not dry_run)
+    counts = result["status"].value_counts().to_dict()
+
+    return {
+        "dry_run": dry_run,
+        "total": len(result),
+        "summary": {status: int(count) for status, count in counts.items()},
+        "results": result.astype(object).where(result.notna(), None).to_dict("records")
+    }
+
+@app.get("/metrics")
+def metrics_endpoint():
+    """
+    Métricas internas de desempenho.
+    """
+
+    return {
+        "exit_detector": get_exit_stats(),
+        "classifier_cache": classifier_cache.stats(),
+        "sessions": session_store.stats(),
+        "fx_cache": search_tools.rate_cache.stats(),
+        "interview_normalization": pending_normalizations.stats(),
+        "micro_batching": chains.batch_stats(),
+        "audit_log": data_tools.storage.audit_stats(),
+        "llm_limiter": llm_module.llm_limiter.stats(),
+        "history_window": HISTORY_WINDOW
+    }
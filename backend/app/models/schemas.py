@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Literal, Optional
+from typing import Literal, Optional, get_args
 
 class TriageIntent(BaseModel):
     category: Literal["CREDITO", "CAMBIO", "OUTROS"] = Field(description="A categoria do serviço bancário solicitado.")
@@ -20,11 +20,19 @@ class UserMessage(BaseModel):
     message: str = Field(description="A mensagem enviada pelo usuário.")
     session_id: str = Field(default="default", description="O ID da sessão do usuário.")
 
+class LimitEvaluationItem(BaseModel):
+    cpf: str = Field(description="O CPF do cliente.")
+    requested_limit: float = Field(gt=0, allow_inf_nan=False, description="O novo limite solicitado.")
+
 class InterviewOfferIntent(BaseModel):
     decision: Literal["ACCEPT", "DECLINE", "UNCLEAR"] = Field(description="Se o usuário aceitou ou recusou a oferta de entrevista.")
 
+CurrencyCode = Literal["USD", "EUR", "GBP", "ARS", "JPY", "CAD", "AUD", "CHF", "CNY", "OTHER"]
+
+SUPPORTED_CURRENCIES = tuple(code for code in get_args(CurrencyCode) if code != "OTHER")
+
 class CurrencyExtraction(BaseModel):
-    currency_code: Literal["USD", "EUR", "GBP", "OTHER"] = Field(description="O código da moeda que o usuário quer consultar. Default para USD se não especificado.")
+    currency_code: CurrencyCode = Field(description="O código da moeda que o usuário quer consultar. Default para USD se não especificado.")
 
 class GreetingIntent(BaseModel):
     is_greeting: bool = Field(description="Verdadeiro se a mensagem for apenas uma saudação (ex: 'Oi', 'Bom dia'). Falso se contiver uma solicitação ou informação.")
@@ -41,3 +49,31 @@ class InterviewNormalization(BaseModel):
     expenses: float = Field(description="Despesas mensais numéricas.")
     dependents: int = Field(description="Número total de dependentes.")
     has_debts: bool = Field(description="Se possui dívidas ativas.")
+
+class InterviewFieldNormalization(BaseModel):
+    income: Optional[float] = Field(default=None, description="Renda mensal numérica, se for o campo pedido.")
+    job_type: Optional[Literal["formal", "autônomo", "desempregado"]] = Field(default=None, description="Tipo de emprego normalizado, se for o campo pedido.")
+    expenses: Optional[float] = Field(default=None, description="Despesas mensais numéricas, se for o campo pedido.")
+    dependents: Optional[int] = Field(default=None, description="Número total de dependentes, se for o campo pedido.")
+    has_debts: Optional[bool] = Field(default=None, description="Se possui dívidas ativas, se for o campo pedido.")
+
+class TriageTurn(TriageIntent, ExitIntent):
+    """Classificação de intenção da triagem combinada com a detecção de saída."""
+
+class GreetingTurn(GreetingIntent, ExitIntent):
+    """Detecção de saudação combinada com a detecção de saída."""
+
+class CPFTurn(CPFExtraction, ExitIntent):
+    """Extração de CPF combinada com a detecção de saída."""
+
+class DateTurn(DateExtraction, ExitIntent):
+    """Extração de data combinada com a detecção de saída."""
+
+class CreditTurn(CreditIntent, ExitIntent):
+    """Classificação de crédito combinada com a detecção de saída."""
+
+class CurrencyTurn(CurrencyExtraction, ExitIntent):
+    """Extração de moeda combinada com a detecção de saída."""
+
+class ValidationTurn(ValidationResult, ExitIntent):
+    """Validação de resposta da entrevista combinada com a detecção de saída."""
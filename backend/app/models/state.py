@@ -1,17 +1,35 @@
 from typing import Annotated, TypedDict, List, Dict, Any
 from langchain_core.messages import BaseMessage
 import operator
+import os
+
+HISTORY_WINDOW = int(os.getenv("HISTORY_WINDOW", "20"))
+
+def keep_last_messages(left: List[BaseMessage], right: List[BaseMessage]) -> List[BaseMessage]:
+    """
+    Reducer de `messages`: concatena as novas mensagens e mantém apenas as
+    últimas HISTORY_WINDOW (0 desativa o limite). Os agentes só leem a última
+    mensagem; o histórico completo, se desejado, vai para o transcript.
+    """
+
+    messages = operator.add(left, right)
+
+    if HISTORY_WINDOW > 0 and len(messages) > HISTORY_WINDOW:
+        return messages[-HISTORY_WINDOW:]
+
+    return messages
 
 class AgentState(TypedDict):
     """
     Representa o estado do grafo do agente.
     """
-    messages: Annotated[List[BaseMessage], operator.add]
+    messages: Annotated[List[BaseMessage], keep_last_messages]
     user_data: Dict[str, Any]
     auth_attempts: int
     next_node: str
     active_agent: str
     interview_step: int
     interview_answers: List[str]
+    interview_values: Dict[str, Any]
     triage_step: str
     temp_cpf: str
@@ -0,0 +1,210 @@
+import atexit
+import csv
+import json
+import os
+import queue
+import threading
+import time
+
+
+_STOP = object()
+
+class CsvAuditSink:
+    """Grava lotes de linhas no final de um CSV, com um único fsync por lote."""
+
+    def __init__(self, path: str, fieldnames):
+        self.path = path
+        self.fieldnames = list(fieldnames)
+
+    def __call__(self, rows):
+        with open(self.path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=self.fieldnames, extrasaction="ignore")
+
+            if f.tell() == 0:
+                writer.writeheader()
+
+            writer.writerows(rows)
+            f.flush()
+            os.fsync(f.fileno())
+
+class JsonlAuditSink:
+    """Grava lotes de registros como linhas JSON no final de um arquivo, com um único fsync por lote."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __call__(self, rows):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+            f.flush()
+            os.fsync(f.fileno())
+
+class AuditLogWriter:
+    """
+    Escritor do log de auditoria com group commit.
+
+    `write` apenas coloca a linha em uma fila limitada e retorna; com a fila
+    cheia espera no máximo `put_timeout` segundos e então descarta a linha.
+    Uma thread em segundo plano junta as linhas que chegarem em até
+    `flush_interval` segundos, no máximo `batch_size` por vez, e as entrega ao
+    `sink` em uma única escrita. Um lote que falhar `max_retries` vezes seguidas
+    é descartado, para que um sink quebrado (ex: disco somente leitura) não
+    trave quem escreve nem o desligamento. Linhas descartadas são contadas em
+    `stats`. A fila é drenada no `close`.
+    """
+
+    def __init__(self, sink, batch_size: int = 500, flush_interval: float = 0.5, max_queue: int = 10000,
+                 max_retries: int = 3, put_timeout: float = 1.0):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.put_timeout = put_timeout
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+        self._stopping = False
+        self.written = 0
+        self.dropped = 0
+        self.failed_batches = 0
+
+    def _start(self):
+        if self._thread is not None:
+            return
+
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def write(self, row: dict, timeout: float = None) -> bool:
+        """
+        Enfileira uma linha para gravação. Espera no máximo `timeout` segundos
+        (padrão `put_timeout`; 0 não espera) por espaço na fila e retorna False
+        se a linha foi descartada.
+        """
+
+        if self._closed:
+            raise RuntimeError("Audit log writer is closed")
+
+        self._start()
+
+        try:
+            self._queue.put(row, timeout=self.put_timeout if timeout is None else timeout)
+
+        except queue.Full:
+
+            with self._lock:
+                self.dropped += 1
+
+            print("Error writing audit log: queue is full, row dropped")
+
+            return False
+
+        return True
+
+    def _next_batch(self):
+        item = self._queue.get()
+
+        if item is _STOP:
+            return None
+
+        batch = [item]
+        deadline = time.monotonic() + self.flush_interval
+
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+
+            if timeout <= 0:
+                break
+
+            try:
+                item = self._queue.get(timeout=timeout)
+
+            except queue.Empty:
+                break
+
+            if item is _STOP:
+                self._queue.task_done()
+                self._stopping = True
+                break
+
+            batch.append(item)
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+
+            if batch is None:
+                self._queue.task_done()
+                return
+
+            for attempt in range(self.max_retries + 1):
+                try:
+                    self.sink(batch)
+
+                    with self._lock:
+                        self.written += len(batch)
+
+                    break
+
+                except Exception as e:
+
+                    if attempt == self.max_retries:
+                        print(f"Error writing audit log batch, dropping {len(batch)} rows: {e}")
+
+                        with self._lock:
+                            self.failed_batches += 1
+                            self.dropped += len(batch)
+
+                        break
+
+                    print(f"Error writing audit log batch, retrying: {e}")
+                    time.sleep(self.flush_interval)
+
+            for _ in batch:
+                self._queue.task_done()
+
+            if self._stopping:
+                return
+
+    def flush(self):
+        """Aguarda até que todas as linhas enfileiradas tenham sido gravadas."""
+
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self, timeout: float = 10.0):
+        """Grava o que restar na fila e encerra a thread."""
+
+        if self._closed:
+            return
+
+        self._closed = True
+
+        if self._thread is not None:
+            deadline = time.monotonic() + timeout
+
+            try:
+                self._queue.put(_STOP, timeout=timeout)
+
+            except queue.Full:
+
+                print("Error closing audit log: queue is still full, pending rows were not written")
+
+                return
+
+            self._thread.join(max(0.0, deadline - time.monotonic()))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "queued": self._queue.qsize(),
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed_batches": self.failed_batches
+            }
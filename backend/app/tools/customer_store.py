@@ -0,0 +1,221 @@
+import atexit
+import os
+import threading
+import time
+import pandas as pd
+from app.tools.journal import UpdateJournal
+
+
+def normalize_cpf(cpf) -> str:
+    """Remove pontuação e espaços do CPF, deixando apenas o valor usado como chave."""
+
+    return str(cpf).replace(".", "").replace("-", "").strip()
+
+def _fsync_dir(path: str):
+    """Garante que uma renomeação dentro do diretório de `path` chegou ao disco."""
+
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+
+    except OSError:
+        return
+
+    try:
+        os.fsync(fd)
+
+    except OSError:
+        pass
+
+    finally:
+        os.close(fd)
+
+class CustomerStore:
+    """
+    Repositório em memória dos clientes.
+
+    Carrega o CSV uma única vez e mantém um índice hash por CPF normalizado.
+    O arquivo só é relido quando seu mtime ou tamanho mudam.
+
+    As atualizações não reescrevem o CSV: são gravadas no journal append-only
+    e aplicadas ao índice, que funciona como overlay sobre o arquivo base.
+    Uma thread de compactação incorpora o journal ao CSV quando ele passa de
+    `compact_bytes` ou quando a entrada mais antiga tem mais de `compact_interval`
+    segundos. A compactação deve rodar em um único processo.
+    """
+
+    def __init__(self, path: str, journal_path: str = None, compact_bytes: int = 64 * 1024, compact_interval: float = 60.0):
+        self.path = path
+        self.journal = UpdateJournal(journal_path or f"{os.path.splitext(path)[0]}.journal")
+        self.compact_bytes = compact_bytes
+        self.compact_interval = compact_interval
+        self._lock = threading.RLock()
+        self._columns = []
+        self._rows = []
+        self._index = {}
+        self._signature = None
+        self._journal_offset = 0
+        self._journal_since = None
+        self._compactor = None
+        self._stop = threading.Event()
+
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.path)
+
+        except FileNotFoundError:
+            return None
+
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _load(self, signature):
+        df = pd.read_csv(self.path, dtype={"cpf": str})
+
+        rows = df.to_dict(orient="records")
+        index = {}
+
+        for row in rows:
+            row["cpf"] = normalize_cpf(row["cpf"])
+            index.setdefault(row["cpf"], row)
+
+        self._columns = list(df.columns)
+        self._rows = rows
+        self._index = index
+        self._signature = signature
+        self._journal_offset = 0
+        self._journal_since = None
+        self._replay_journal()
+
+    def _replay_journal(self):
+        entries, offset = self.journal.read_from(self._journal_offset)
+
+        for cpf, field, value in entries:
+            row = self._index.get(cpf)
+
+            if row is not None:
+                row[field] = value
+
+        if entries and self._journal_since is None:
+            self._journal_since = time.monotonic()
+
+        self._journal_offset = offset
+
+    def refresh(self):
+        """Recarrega o CSV se o arquivo foi alterado e aplica entradas novas do journal."""
+
+        signature = self._file_signature()
+        journal_size = self.journal.size()
+
+        if signature is not None and signature == self._signature and journal_size == self._journal_offset:
+            return
+
+        with self._lock:
+            signature = self._file_signature()
+            journal_size = self.journal.size()
+
+            if signature != self._signature or journal_size < self._journal_offset:
+                self._load(signature)
+
+            elif journal_size > self._journal_offset:
+                self._replay_journal()
+
+    def get(self, cpf: str):
+        """Retorna uma cópia do cliente com o CPF informado, ou None."""
+
+        self.refresh()
+
+        row = self._index.get(normalize_cpf(cpf))
+
+        return dict(row) if row is not None else None
+
+    def update(self, cpf: str, field: str, value) -> bool:
+        """Registra a alteração de um campo do cliente no journal e no índice."""
+
+        self.refresh()
+        self._start_compactor()
+
+        cpf = normalize_cpf(cpf)
+
+        if cpf not in self._index:
+            return False
+
+        # O fsync acontece fora da trava do índice: atualizações de clientes
+        # diferentes seguem em paralelo e dividem o mesmo fsync no journal.
+        self.journal.append(cpf, field, value)
+
+        with self._lock:
+            self._replay_journal()
+
+        return True
+
+    def compact(self):
+        """
+        Incorpora o journal ao CSV base e o esvazia. O novo CSV é gravado num
+        arquivo temporário com fsync e só então substitui o original; o journal
+        só é truncado depois que a troca chegou ao disco, para que uma queda no
+        meio nunca perca as atualizações. Novas alterações esperam a compactação
+        terminar.
+        """
+
+        with self._lock, self.journal.paused():
+            self.refresh()
+
+            if self._journal_offset == 0:
+                return
+
+            tmp_path = f"{self.path}.tmp"
+
+            with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+                pd.DataFrame(self._rows, columns=self._columns).to_csv(f, index=False)
+                f.flush()
+                os.fsync(f.fileno())
+
+            os.replace(tmp_path, self.path)
+            _fsync_dir(self.path)
+            self.journal.truncate()
+
+            self._signature = self._file_signature()
+            self._journal_offset = 0
+            self._journal_since = None
+
+    def _should_compact(self) -> bool:
+        if self._journal_offset >= self.compact_bytes:
+            return True
+
+        return self._journal_since is not None and time.monotonic() - self._journal_since >= self.compact_interval
+
+    def _compactor_loop(self):
+        while not self._stop.wait(min(self.compact_interval, 1.0)):
+            try:
+                if self._should_compact():
+                    self.compact()
+
+            except Exception as e:
+
+                print(f"Error compacting customer journal: {e}")
+
+    def _start_compactor(self):
+        if self._compactor is not None:
+            return
+
+        with self._lock:
+            if self._compactor is None:
+                self._compactor = threading.Thread(target=self._compactor_loop, name="customer-compactor", daemon=True)
+                self._compactor.start()
+                atexit.register(self.close)
+
+    def close(self):
+        """Para a thread de compactação e incorpora o que restar no journal."""
+
+        self._stop.set()
+
+        try:
+            self.compact()
+
+        except Exception as e:
+
+            print(f"Error compacting customer journal on shutdown: {e}")
+
+    def __len__(self):
+        self.refresh()
+
+        return len(self._index)
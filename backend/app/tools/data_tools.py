@@ -1,7 +1,14 @@
-import pandas as pd
 import os
 from datetime import datetime
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+from app.tools.customer_store import normalize_cpf
+from app.tools.locks import StripedLock
+from app.tools.score_rules import max_allowed_array
+from app.tools.storage import CsvStorage
 
+load_dotenv()
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(BASE_DIR, "data")
@@ -9,20 +16,52 @@ CLIENTES_PATH = os.path.join(DATA_DIR, "clientes.csv")
 SCORE_LIMITE_PATH = os.path.join(DATA_DIR, "score_limite.csv")
 SOLICITACOES_PATH = os.path.join(DATA_DIR, "solicitacoes_aumento_limite.csv")
 
+SQLITE_PATH = os.getenv("SQLITE_PATH", os.path.join(DATA_DIR, "banco.db"))
+
+DATA_BACKEND = os.getenv("DATA_BACKEND", "csv")
+
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "0.5"))
+
+def create_storage(backend: str = DATA_BACKEND):
+    """
+    Cria o backend de armazenamento configurado em DATA_BACKEND ('csv' ou 'sqlite').
+    """
+
+    if backend == "sqlite":
+        from app.tools.sqlite_storage import SqliteStorage
+
+        return SqliteStorage(SQLITE_PATH, AUDIT_BATCH_SIZE, AUDIT_FLUSH_INTERVAL)
+
+    if backend != "csv":
+        raise ValueError(f"Unknown data backend: {backend}")
+
+    return CsvStorage(CLIENTES_PATH, SCORE_LIMITE_PATH, SOLICITACOES_PATH, AUDIT_BATCH_SIZE, AUDIT_FLUSH_INTERVAL)
+
+storage = create_storage()
+
+customer_locks = StripedLock()
+
+def customer_transaction(cpf: str):
+    """
+    Serializa as operações de leitura/decisão/escrita de um mesmo cliente.
+    Clientes diferentes (em faixas diferentes) seguem em paralelo.
+
+    Uso: `with customer_transaction(cpf): ...`
+    """
+
+    return customer_locks.hold(normalize_cpf(cpf))
+
 def authenticate_user(cpf: str, data_nascimento: str):
     """
     Autentica um usuário por CPF e Data de Nascimento.
     Retorna o dicionário do usuário se encontrado, caso contrário None.
     """
     try:
-        df = pd.read_csv(CLIENTES_PATH, dtype={"cpf": str})
-        
-        cpf = cpf.replace(".", "").replace("-", "").strip()
-        
-        user = df[(df["cpf"] == cpf) & (df["data_nascimento"] == data_nascimento)]
-        
-        if not user.empty:
-            return user.iloc[0].to_dict()
+        user = storage.get_customer(cpf)
+
+        if user and user["data_nascimento"] == data_nascimento:
+            return user
         return None
 
     except Exception as e:
@@ -35,16 +74,7 @@ def get_user_data(cpf: str):
     """Recupera dados do usuário por CPF."""
     try:
 
-        df = pd.read_csv(CLIENTES_PATH, dtype={"cpf": str})
-
-        cpf = cpf.replace(".", "").replace("-", "").strip()
-
-        user = df[df["cpf"] == cpf]
-
-        if not user.empty:
-            return user.iloc[0].to_dict()
-
-        return None
+        return storage.get_customer(cpf)
 
     except Exception as e:
 
@@ -62,58 +92,62 @@ def check_credit_limit(cpf: str):
 
     return None
 
+def _record_limit_request(cpf: str, user: dict, new_limit: float):
+    """
+    Decide e aplica um pedido de aumento de limite.
+    Deve ser chamada dentro de `customer_transaction(cpf)`.
+    Retorna (status, max_allowed, registro); o registro deve ser enviado a
+    `storage.log_limit_request` depois de liberar a trava, para que uma fila de
+    auditoria cheia não segure a trava do cliente.
+    """
+
+    current_score = user["score"]
+    current_limit = user["limite_atual"]
+
+    max_allowed = storage.max_allowed(current_score)
+
+    status = "rejeitado"
+
+    if max_allowed is not None and new_limit <= max_allowed:
+        status = "aprovado"
+
+    new_request = {
+        "cpf_cliente": cpf,
+        "data_hora_solicitacao": datetime.now().isoformat(),
+        "limite_atual": current_limit,
+        "novo_limite_solicitado": new_limit,
+        "status_pedido": status
+    }
+
+    if status == "aprovado":
+        update_user_limit(cpf, new_limit)
+
+    return status, max_allowed, new_request
+
 def request_limit_increase(cpf: str, new_limit: float):
     """
     Processa uma solicitação de aumento de limite.
+    Decisão e atualização do limite ocorrem como uma única transação por
+    cliente; o registro de auditoria é enfileirado depois de liberar a trava.
     Retorna um dict com status e mensagem.
     """
 
     try:
-        user = get_user_data(cpf)
+        with customer_transaction(cpf):
+            user = get_user_data(cpf)
 
-        if not user:
-            return {"status": "error", "message": "User not found"}
-        
-        current_score = user["score"]
-        current_limit = user["limite_atual"]
-        
-        score_df = pd.read_csv(SCORE_LIMITE_PATH)
-        
-        rule = score_df[(score_df["score_min"] <= current_score) & (score_df["score_max"] >= current_score)]
-        
-        status = "rejeitado"
-
-        if not rule.empty:
-            max_allowed = rule.iloc[0]["limite_max"]
-
-            if new_limit <= max_allowed:
-                status = "aprovado"
-             
-        new_request = {
-            "cpf_cliente": cpf,
-            "data_hora_solicitacao": datetime.now().isoformat(),
-            "limite_atual": current_limit,
-            "novo_limite_solicitado": new_limit,
-            "status_pedido": status
-        }
-        
-        
-        requests_df = pd.DataFrame([new_request])
+            if not user:
+                return {"status": "error", "message": "User not found"}
+
+            status, max_allowed, new_request = _record_limit_request(cpf, user, new_limit)
 
-        if os.path.exists(SOLICITACOES_PATH) and os.path.getsize(SOLICITACOES_PATH) > 0:
-            requests_df.to_csv(SOLICITACOES_PATH, mode='a', header=False, index=False)
+        storage.log_limit_request(new_request)
 
-        else:
-            requests_df.to_csv(SOLICITACOES_PATH, mode='w', header=True, index=False)
-            
-        if status == "aprovado":
-            update_user_limit(cpf, new_limit)
-            
         return {
             "status": status, 
             "message": f"Request {status}",
-            "current_score": int(current_score),
-            "max_allowed": float(max_allowed),
+            "current_score": int(user["score"]),
+            "max_allowed": float(max_allowed) if max_allowed is not None else 0.0,
             "limit_requested": float(new_limit)
         }
         
@@ -123,19 +157,71 @@ def request_limit_increase(cpf: str, new_limit: float):
 
         return {"status": "error", "message": str(e)}
 
+def evaluate_limit_requests(requests: pd.DataFrame, apply: bool = False) -> pd.DataFrame:
+    """
+    Avalia pedidos de aumento de limite em lote (colunas `cpf` e `requested_limit`), sem LLM.
+
+    Os clientes são buscados de uma vez e as faixas de score_limite aplicadas de
+    forma vetorizada. Status possíveis: aprovado, rejeitado, nao_encontrado e
+    invalido (valor pedido ausente, não numérico, infinito ou menor ou igual a zero).
+
+    Com `apply=True`, cada pedido válido é registrado e, se aprovado, o limite é
+    atualizado, cliente a cliente dentro de `customer_transaction`, com os dados
+    relidos sob a trava (mesma regra de `request_limit_increase`).
+    """
+
+    requested = pd.to_numeric(requests["requested_limit"], errors="coerce").astype(float)
+
+    df = pd.DataFrame({
+        "cpf": requests["cpf"].map(normalize_cpf),
+        "requested_limit": requested.where(np.isfinite(requested) & (requested > 0))
+    })
+
+    customers = pd.DataFrame(storage.get_customers(df["cpf"].unique()), columns=["cpf", "score", "limite_atual"])
+    customers["cpf"] = customers["cpf"].map(normalize_cpf)
+
+    df = df.merge(customers.drop_duplicates("cpf"), on="cpf", how="left")
+    df["max_allowed"] = max_allowed_array(storage.score_bands(), df["score"])
+    df["status"] = np.select(
+        [df["score"].isna(), df["requested_limit"].isna(), df["requested_limit"] <= df["max_allowed"]],
+        ["nao_encontrado", "invalido", "aprovado"],
+        "rejeitado"
+    )
+
+    if apply:
+        for i in np.flatnonzero(df["status"].isin(["aprovado", "rejeitado"]).to_numpy()):
+            cpf = df.at[i, "cpf"]
+
+            try:
+                with customer_transaction(cpf):
+                    user = get_user_data(cpf)
+
+                    if not user:
+                        df.at[i, "status"] = "nao_encontrado"
+                        continue
+
+                    status, max_allowed, new_request = _record_limit_request(cpf, user, float(df.at[i, "requested_limit"]))
+
+                storage.log_limit_request(new_request)
+
+                df.at[i, "score"] = user["score"]
+                df.at[i, "limite_atual"] = user["limite_atual"]
+                df.at[i, "max_allowed"] = max_allowed if max_allowed is not None else np.nan
+                df.at[i, "status"] = status
+
+            except Exception as e:
+
+                print(f"Error applying limit request for {cpf}: {e}")
+                df.at[i, "status"] = "erro"
+
+    return df
+
 def update_user_limit(cpf: str, new_limit: float):
-    """Atualiza o limite do usuário no CSV."""
+    """Atualiza o limite do usuário no armazenamento."""
 
     try:
-        df = pd.read_csv(CLIENTES_PATH, dtype={"cpf": str})
-        cpf = cpf.replace(".", "").replace("-", "").strip()
-        
-        if cpf in df["cpf"].values:
-            df.loc[df["cpf"] == cpf, "limite_atual"] = new_limit
-            df.to_csv(CLIENTES_PATH, index=False)
-            return True
-
-        return False
+        with customer_transaction(cpf):
+            return storage.update_customer(cpf, "limite_atual", new_limit)
 
     except Exception as e:
 
@@ -144,18 +230,11 @@ def update_user_limit(cpf: str, new_limit: float):
         return False
 
 def update_user_score(cpf: str, new_score: int):
-    """Atualiza o score do usuário no CSV."""
+    """Atualiza o score do usuário no armazenamento."""
 
     try:
-        df = pd.read_csv(CLIENTES_PATH, dtype={"cpf": str})
-        cpf = cpf.replace(".", "").replace("-", "").strip()
-        
-        if cpf in df["cpf"].values:
-            df.loc[df["cpf"] == cpf, "score"] = new_score
-            df.to_csv(CLIENTES_PATH, index=False)
-            return True
-
-        return False
+        with customer_transaction(cpf):
+            return storage.update_customer(cpf, "score", new_score)
 
     except Exception as e:
 
@@ -0,0 +1,137 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+
+class UpdateJournal:
+    """
+    Journal append-only das alterações de clientes.
+
+    Cada alteração é uma linha JSON compacta `[cpf, campo, valor]`, gravada
+    com fsync antes de ser confirmada. Alterações que chegam enquanto um fsync
+    está em andamento são gravadas juntas no fsync seguinte (group commit), por
+    quem chegou primeiro. O arquivo é lido por offset, para que apenas as
+    entradas novas precisem ser reaplicadas.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Condition()
+        self._file = None
+        self._pending = []
+        self._flushing = False
+        self._paused = 0
+        self.appends = 0
+        self.fsyncs = 0
+
+    def size(self) -> int:
+        try:
+            return os.path.getsize(self.path)
+
+        except FileNotFoundError:
+            return 0
+
+    def append(self, cpf: str, field: str, value):
+        """Grava uma alteração no final do journal e só retorna depois do fsync."""
+
+        line = json.dumps([cpf, field, value], ensure_ascii=False, separators=(",", ":")) + "\n"
+        ticket = {"done": False, "error": None}
+
+        with self._lock:
+            while self._paused:
+                self._lock.wait()
+
+            self._pending.append((line.encode("utf-8"), ticket))
+            self.appends += 1
+
+            while not ticket["done"]:
+                if self._flushing:
+                    self._lock.wait()
+                    continue
+
+                self._flush_pending()
+
+        if ticket["error"] is not None:
+            raise ticket["error"]
+
+    def _flush_pending(self):
+        """Grava as linhas pendentes com um único fsync. Chamada com `_lock` adquirido."""
+
+        batch, self._pending = self._pending, []
+        self._flushing = True
+        error = None
+
+        self._lock.release()
+
+        try:
+            if self._file is None:
+                self._file = open(self.path, "ab")
+
+            self._file.write(b"".join(line for line, _ in batch))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+        except Exception as e:
+
+            error = e
+
+        finally:
+            self._lock.acquire()
+
+            self.fsyncs += 1
+            self._flushing = False
+
+            for _, ticket in batch:
+                ticket["done"] = True
+                ticket["error"] = error
+
+            self._lock.notify_all()
+
+    @contextmanager
+    def paused(self):
+        """
+        Bloqueia novas alterações e espera as pendentes chegarem ao disco.
+        Usado pela compactação entre a leitura do journal e o truncate.
+        """
+
+        with self._lock:
+            self._paused += 1
+
+            while self._flushing or self._pending:
+                self._lock.wait()
+
+        try:
+            yield
+
+        finally:
+            with self._lock:
+                self._paused -= 1
+                self._lock.notify_all()
+
+    def read_from(self, offset: int):
+        """
+        Lê as entradas completas a partir do offset informado.
+        Retorna a lista de entradas e o offset logo após a última linha lida.
+        """
+
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+
+        except FileNotFoundError:
+            return [], 0
+
+        end = data.rfind(b"\n") + 1
+        entries = [json.loads(line) for line in data[:end].splitlines() if line]
+
+        return entries, offset + end
+
+    def truncate(self):
+        """Esvazia o journal após suas entradas terem sido incorporadas ao arquivo base."""
+
+        with self._lock:
+            with open(self.path, "wb") as f:
+                f.flush()
+                os.fsync(f.fileno())
@@ -0,0 +1,26 @@
+import threading
+from contextlib import contextmanager
+
+
+class StripedLock:
+    """
+    Conjunto fixo de locks reentrantes distribuídos por hash da chave.
+
+    Operações sobre a mesma chave são serializadas, enquanto chaves em
+    faixas diferentes seguem em paralelo sem um lock global.
+    """
+
+    def __init__(self, stripes: int = 64):
+        self._locks = [threading.RLock() for _ in range(stripes)]
+
+    def lock_for(self, key: str) -> threading.RLock:
+        return self._locks[hash(key) % len(self._locks)]
+
+    @contextmanager
+    def hold(self, key: str):
+        """Mantém o lock da chave durante o bloco `with`."""
+
+        lock = self.lock_for(key)
+
+        with lock:
+            yield
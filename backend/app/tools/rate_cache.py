@@ -0,0 +1,129 @@
+import asyncio
+import time
+from types import MappingProxyType
+from typing import NamedTuple, Optional
+
+
+class Quote(NamedTuple):
+    """
+    Cotação servida pelo cache: valor, idade em segundos e se está vencida
+    (mais velha que a janela de stale-while-revalidate, servida por falha da API).
+    """
+
+    rate: float
+    age: float
+    stale: bool
+
+class RateCache:
+    """
+    Cache de cotações com TTL, stale-while-revalidate e single-flight.
+
+    - Até `ttl` segundos a cotação é servida direto da memória.
+    - Entre `ttl` e `ttl + stale_ttl` ela ainda é servida, e uma atualização é
+      disparada em segundo plano.
+    - Depois disso a requisição espera pela atualização. Se a API falhar, a
+      última cotação boa é servida junto com a sua idade.
+
+    Requisições simultâneas da mesma moeda compartilham uma única chamada à API.
+
+    As cotações ficam num snapshot imutável, trocado por inteiro a cada
+    atualização (`put` ou `publish`); leitores nunca veem um estado parcial.
+    """
+
+    def __init__(self, fetch, ttl: float = 30.0, stale_ttl: float = 300.0):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries = MappingProxyType({})
+        self._inflight = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.upstream_calls = 0
+        self.upstream_errors = 0
+
+    def _quote(self, currency: str) -> Optional[Quote]:
+        entry = self._entries.get(currency)
+
+        if entry is None:
+            return None
+
+        age = time.monotonic() - entry[1]
+
+        return Quote(entry[0], age, age > self.ttl + self.stale_ttl)
+
+    def put(self, currency: str, rate: float):
+        self.publish({currency: rate})
+
+    def publish(self, rates: dict):
+        """Publica um novo snapshot com as cotações informadas (as demais são mantidas)."""
+
+        now = time.monotonic()
+        entries = dict(self._entries)
+        entries.update((currency, (rate, now)) for currency, rate in rates.items())
+        self._entries = MappingProxyType(entries)
+
+    def snapshot(self):
+        """Snapshot imutável atual: moeda -> (taxa, instante da coleta)."""
+
+        return self._entries
+
+    async def _refresh(self, currency: str) -> Optional[Quote]:
+        self.upstream_calls += 1
+
+        try:
+            rate = await self.fetch(currency)
+
+        except Exception as e:
+
+            self.upstream_errors += 1
+            print(f"Error fetching exchange rate for {currency}: {e}")
+
+            return None
+
+        self.put(currency, rate)
+
+        return Quote(rate, 0.0, False)
+
+    def _refresh_once(self, currency: str) -> asyncio.Task:
+        task = self._inflight.get(currency)
+
+        if task is None:
+            task = asyncio.ensure_future(self._refresh(currency))
+            self._inflight[currency] = task
+            task.add_done_callback(lambda _: self._inflight.pop(currency, None))
+
+        return task
+
+    async def get(self, currency: str) -> Optional[Quote]:
+        """Retorna a cotação da moeda, ou None se nunca houve uma cotação válida."""
+
+        quote = self._quote(currency)
+
+        if quote is not None and quote.age <= self.ttl:
+            self.hits += 1
+
+            return quote
+
+        if quote is not None and not quote.stale:
+            self.stale_hits += 1
+            self._refresh_once(currency)
+
+            return quote
+
+        self.misses += 1
+        fresh = await asyncio.shield(self._refresh_once(currency))
+
+        return fresh if fresh is not None else self._quote(currency)
+
+    def stats(self) -> dict:
+        return {
+            "pairs": len(self._entries),
+            "ttl": self.ttl,
+            "stale_ttl": self.stale_ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "upstream_calls": self.upstream_calls,
+            "upstream_errors": self.upstream_errors
+        }
@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+from bisect import bisect_right
+from typing import NamedTuple, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+
+class ScoreBands(NamedTuple):
+    """Faixas de score compiladas: limites inferiores/superiores e limite máximo de cada faixa."""
+
+    mins: Tuple[int, ...]
+    maxs: Tuple[int, ...]
+    limits: Tuple[float, ...]
+    signature: Optional[tuple]
+
+def compile_bands(df: pd.DataFrame, signature=None) -> ScoreBands:
+    """
+    Ordena e valida as faixas de score.
+    Lança ValueError se houver faixas invertidas, sobrepostas ou com lacunas.
+    """
+
+    df = df.sort_values("score_min").reset_index(drop=True)
+
+    mins = tuple(int(v) for v in df["score_min"])
+    maxs = tuple(int(v) for v in df["score_max"])
+    limits = tuple(float(v) for v in df["limite_max"])
+
+    for i, (low, high) in enumerate(zip(mins, maxs)):
+        if low > high:
+            raise ValueError(f"Invalid score band {low}-{high}: score_min greater than score_max")
+
+        if i > 0 and low <= maxs[i - 1]:
+            raise ValueError(f"Score band {low}-{high} overlaps {mins[i - 1]}-{maxs[i - 1]}")
+
+        if i > 0 and low > maxs[i - 1] + 1:
+            raise ValueError(f"Gap between score bands {mins[i - 1]}-{maxs[i - 1]} and {low}-{high}")
+
+    return ScoreBands(mins, maxs, limits, signature)
+
+def max_allowed_array(bands: ScoreBands, scores) -> np.ndarray:
+    """
+    Versão vetorizada de `ScoreRules.max_allowed`: busca a faixa de cada score
+    com np.searchsorted. Scores fora de qualquer faixa (ou ausentes) viram NaN.
+    """
+
+    scores = np.asarray(scores, dtype=np.float64)
+    mins = np.asarray(bands.mins, dtype=np.float64)
+    maxs = np.asarray(bands.maxs, dtype=np.float64)
+    limits = np.asarray(bands.limits, dtype=np.float64)
+
+    if len(limits) == 0:
+        return np.full(scores.shape, np.nan)
+
+    i = np.searchsorted(mins, scores, side="right") - 1
+    safe = np.clip(i, 0, len(limits) - 1)
+    covered = (i >= 0) & (scores <= maxs[safe])
+
+    return np.where(covered, limits[safe], np.nan)
+
+class ScoreRules:
+    """
+    Índice de intervalos das regras de score_limite.
+
+    As faixas são compiladas uma vez em arrays ordenados e consultadas com bisect.
+    Quando o arquivo muda, a nova versão é validada e trocada atomicamente;
+    se for inválida, a versão anterior continua em uso.
+    """
+
+    def __init__(self, path: str, check_interval: float = 1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._bands = None
+        self._next_check = 0.0
+
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.path)
+
+        except FileNotFoundError:
+            return None
+
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def refresh(self, force: bool = False):
+        """Recompila as faixas se o arquivo mudou desde a última carga."""
+
+        now = time.monotonic()
+
+        if not force and self._bands is not None and now < self._next_check:
+            return
+
+        with self._lock:
+            self._next_check = now + self.check_interval
+            signature = self._file_signature()
+
+            if self._bands is not None and signature == self._bands.signature:
+                return
+
+            try:
+                self._bands = compile_bands(pd.read_csv(self.path), signature)
+
+            except Exception as e:
+
+                if self._bands is None:
+                    raise
+
+                print(f"Error reloading score rules, keeping previous version: {e}")
+
+    @property
+    def bands(self) -> ScoreBands:
+        self.refresh()
+
+        return self._bands
+
+    def max_allowed(self, score) -> Optional[float]:
+        """Retorna o limite máximo permitido para o score, ou None se nenhuma faixa o cobre."""
+
+        bands = self.bands
+        i = bisect_right(bands.mins, score) - 1
+
+        if i >= 0 and score <= bands.maxs[i]:
+            return bands.limits[i]
+
+        return None
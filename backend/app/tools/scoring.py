@@ -0,0 +1,138 @@
+import argparse
+import os
+import numpy as np
+import pandas as pd
+
+
+PESO_RENDA = 30
+
+PESO_EMPREGO = {
+    "formal": 300,
+    "autônomo": 200,
+    "desempregado": 0
+}
+
+PESO_DEPENDENTES = {
+    0: 100,
+    1: 80,
+    2: 60,
+    "3+": 30
+}
+
+PESO_DIVIDAS = {
+    True: -100,
+    False: 100
+}
+
+SCORE_FALLBACK = 500
+
+SCORE_COLUMNS = ("income", "job_type", "expenses", "dependents", "has_debts")
+
+TRUE_VALUES = ("true", "1", "sim", "s", "yes")
+FALSE_VALUES = ("false", "0", "nao", "não", "n", "no")
+
+def score_arrays(income, job_type, expenses, dependents, has_debts) -> np.ndarray:
+    """
+    Versão vetorizada de `calculate_score` (app.agents.interview) sobre colunas.
+    Produz exatamente o mesmo resultado linha a linha, inclusive o score padrão
+    (SCORE_FALLBACK) nos casos em que a função escalar falharia: divisão por
+    zero, valores não finitos ou `has_debts` que não seja booleano.
+    """
+
+    income = np.asarray(income, dtype=np.float64)
+    expenses = np.asarray(expenses, dtype=np.float64)
+    dependents = np.asarray(dependents, dtype=np.float64)
+    job_type = pd.Series(job_type, dtype=object)
+    has_debts = pd.Series(has_debts, dtype=object)
+
+    p_emp = job_type.map(PESO_EMPREGO).fillna(0).to_numpy(dtype=np.float64)
+
+    p_dep = np.select(
+        [dependents == 0, dependents == 1, dependents == 2],
+        [PESO_DEPENDENTES[0], PESO_DEPENDENTES[1], PESO_DEPENDENTES[2]],
+        PESO_DEPENDENTES["3+"]
+    ).astype(np.float64)
+
+    debts_known = has_debts.map(lambda v: isinstance(v, (bool, int, float, np.bool_, np.number)) and v in (0, 1)).to_numpy(dtype=bool)
+    debts = has_debts.where(debts_known, False).astype(bool).to_numpy()
+    p_div = np.where(debts, PESO_DIVIDAS[True], PESO_DIVIDAS[False]).astype(np.float64)
+
+    divisor = expenses + 1
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        score = (income / divisor) * PESO_RENDA + p_emp + p_dep + p_div
+
+    valid = (divisor != 0) & np.isfinite(score) & debts_known
+    score = np.clip(np.trunc(np.where(valid, score, 0)), 0, 1000).astype(np.int64)
+
+    return np.where(valid, score, SCORE_FALLBACK)
+
+def parse_bool_column(values: pd.Series) -> pd.Series:
+    """Converte textos como 'True', 'sim', '0' em booleanos; o resto vira None."""
+
+    text = values.astype(str).str.strip().str.lower()
+
+    return pd.Series(
+        np.select([text.isin(TRUE_VALUES), text.isin(FALSE_VALUES)], [True, False], None),
+        index=values.index,
+        dtype=object
+    )
+
+def score_frame(df: pd.DataFrame) -> np.ndarray:
+    """Calcula o score de um DataFrame com as colunas de SCORE_COLUMNS."""
+
+    has_debts = df["has_debts"]
+
+    if has_debts.dtype != bool:
+        has_debts = parse_bool_column(has_debts)
+
+    return score_arrays(
+        pd.to_numeric(df["income"], errors="coerce"),
+        df["job_type"],
+        pd.to_numeric(df["expenses"], errors="coerce"),
+        pd.to_numeric(df["dependents"], errors="coerce"),
+        has_debts
+    )
+
+def rescore_file(input_path: str, output_path: str, chunksize: int = 100000, column: str = "score") -> int:
+    """
+    Recalcula o score de todas as linhas de um CSV em blocos de `chunksize`
+    linhas. O resultado é gravado em um arquivo temporário e só substitui
+    `output_path` (os.replace) quando todos os blocos terminarem.
+    Retorna o número de linhas processadas.
+    """
+
+    tmp_path = f"{output_path}.tmp"
+    rows = 0
+
+    try:
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            for chunk in pd.read_csv(input_path, chunksize=chunksize, dtype={"cpf": str}):
+                chunk[column] = score_frame(chunk)
+                chunk.to_csv(f, index=False, header=rows == 0)
+                rows += len(chunk)
+
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp_path, output_path)
+
+    except Exception:
+
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+        raise
+
+    return rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recalcula o score de um arquivo de perfis em lote.")
+    parser.add_argument("input", help="CSV com as colunas " + ", ".join(SCORE_COLUMNS))
+    parser.add_argument("output", nargs="?", help="CSV de saída (padrão: sobrescreve a entrada)")
+    parser.add_argument("--chunksize", type=int, default=100000)
+    args = parser.parse_args()
+
+    total = rescore_file(args.input, args.output or args.input, args.chunksize)
+
+    print(f"{total} linhas processadas")
@@ -1,41 +1,126 @@
-import requests
+import asyncio
+import os
+from typing import Optional
+import httpx
+from app.tools.rate_cache import Quote, RateCache
+from app.models.schemas import SUPPORTED_CURRENCIES
 
-def get_exchange_rate(currency: str) -> float:
+AWESOMEAPI_URL = os.getenv("AWESOMEAPI_URL", "https://economia.awesomeapi.com.br").rstrip("/")
+
+_http_client = None
+
+def open_http_client() -> httpx.AsyncClient:
     """
-    Busca a taxa de câmbio atual para a moeda dada em BRL usando AwesomeAPI.
-    
-    Args:
-        currency (str): O código da moeda (ex: 'USD', 'EUR', 'GBP').
-        
-    Returns:
-        float: A taxa de câmbio atual (preço de compra).
+    Retorna o cliente HTTP assíncrono compartilhado (keep-alive, pool de conexões),
+    criando-o na primeira chamada.
+    """
+
+    global _http_client
+
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            timeout=5,
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=32)
+        )
+
+    return _http_client
+
+async def close_http_client():
+    """Fecha o cliente HTTP compartilhado."""
+
+    global _http_client
+
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+async def _fetch_rates(currencies) -> dict:
+    """
+    Consulta várias moedas em uma única chamada à AwesomeAPI
+    (ex: /last/USD-BRL,EUR-BRL,GBP-BRL). Retorna moeda -> taxa de compra.
+    """
+
+    pairs = ",".join(f"{currency}-BRL" for currency in currencies)
+    response = await open_http_client().get(f"{AWESOMEAPI_URL}/last/{pairs}")
+    response.raise_for_status()
+
+    data = response.json()
+
+    return {currency: float(data[f"{currency}BRL"]["bid"]) for currency in currencies if f"{currency}BRL" in data}
+
+async def _fetch_rate(currency: str) -> float:
+    """Consulta a AwesomeAPI; levanta exceção se a cotação não vier."""
+
+    rates = await _fetch_rates([currency])
+
+    if currency not in rates:
+        raise ValueError(f"Currency pair not found in response: {currency}-BRL")
+
+    return rates[currency]
+
+rate_cache = RateCache(
+    _fetch_rate,
+    ttl=float(os.getenv("FX_CACHE_TTL", "30")),
+    stale_ttl=float(os.getenv("FX_STALE_TTL", "300"))
+)
+
+FX_REFRESH_INTERVAL = float(os.getenv("FX_REFRESH_INTERVAL", "15"))
+
+async def refresh_rates(currencies=SUPPORTED_CURRENCIES) -> int:
+    """Busca todas as moedas suportadas em uma chamada e publica um novo snapshot."""
+
+    rates = await _fetch_rates(currencies)
+    rate_cache.publish(rates)
+
+    return len(rates)
+
+async def run_rate_refresher(interval: float = FX_REFRESH_INTERVAL):
+    """
+    Tarefa de fundo que mantém o snapshot de cotações atualizado. Com o
+    intervalo menor que FX_CACHE_TTL, o agente de câmbio lê sempre da memória,
+    sem chamadas de rede durante a requisição.
     """
 
+    while True:
+        try:
+            await refresh_rates()
+
+        except Exception as e:
+
+            print(f"Error refreshing exchange rates: {e}")
+
+        await asyncio.sleep(interval)
+
+def normalize_currency(currency: str) -> str:
     currency = currency.upper()
-    
+
     if currency == "DÓLAR" or currency == "DOLAR":
         currency = "USD"
-    
-    try:
-        url = f"https://economia.awesomeapi.com.br/last/{currency}-BRL"
-        response = requests.get(url, timeout=5)
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        key = f"{currency}BRL"
-        
-        if key in data:
-            return float(data[key]["bid"])
 
-        else:
+    return currency
 
-            print(f"Currency pair not found in response: {data}")
-            
-            return 0.0
-            
-    except Exception as e:
+async def get_exchange_quote(currency: str) -> Optional[Quote]:
+    """
+    Busca a cotação da moeda em BRL passando pelo cache de cotações.
+
+    Returns:
+        Quote: taxa (preço de compra), idade em segundos e se está vencida;
+        None se a API nunca respondeu para essa moeda.
+    """
+
+    return await rate_cache.get(normalize_currency(currency))
+
+async def get_exchange_rate(currency: str) -> float:
+    """
+    Busca a taxa de câmbio atual para a moeda dada em BRL usando AwesomeAPI.
+    
+    Args:
+        currency (str): O código da moeda (ex: 'USD', 'EUR', 'GBP'; ver SUPPORTED_CURRENCIES).
+        
+    Returns:
+        float: A taxa de câmbio atual (preço de compra), ou 0.0 se indisponível.
+    """
 
-        print(f"Error fetching exchange rate for {currency}: {e}")
+    quote = await get_exchange_quote(currency)
 
-        return 0.0
+    return quote.rate if quote is not None else 0.0
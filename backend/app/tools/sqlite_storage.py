@@ -0,0 +1,205 @@
+import os
+import sqlite3
+import sys
+import threading
+import pandas as pd
+from app.tools.audit_log import AuditLogWriter
+from app.tools.customer_store import normalize_cpf
+from app.tools.score_rules import ScoreBands, compile_bands
+from app.tools.storage import REQUEST_FIELDS, StorageBackend
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS clientes (
+    cpf TEXT PRIMARY KEY,
+    data_nascimento TEXT NOT NULL,
+    nome TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    limite_atual REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS score_limite (
+    score_min INTEGER NOT NULL,
+    score_max INTEGER NOT NULL,
+    limite_max REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_score_limite_min ON score_limite (score_min);
+
+CREATE TABLE IF NOT EXISTS solicitacoes_aumento_limite (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    cpf_cliente TEXT NOT NULL,
+    data_hora_solicitacao TEXT NOT NULL,
+    limite_atual REAL,
+    novo_limite_solicitado REAL,
+    status_pedido TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_solicitacoes_cpf ON solicitacoes_aumento_limite (cpf_cliente);
+"""
+
+CUSTOMER_FIELDS = ("data_nascimento", "nome", "score", "limite_atual")
+
+INSERT_REQUEST_SQL = f"INSERT INTO solicitacoes_aumento_limite ({', '.join(REQUEST_FIELDS)}) VALUES ({', '.join('?' for _ in REQUEST_FIELDS)})"
+
+class SqliteStorage(StorageBackend):
+    """
+    Backend SQLite em modo WAL.
+
+    Cada thread usa sua própria conexão, aberta sob demanda e reaproveitada
+    nas chamadas seguintes. Com WAL, leituras não bloqueiam a escrita e várias
+    threads do FastAPI podem autenticar e consultar limites em paralelo.
+    As solicitações de aumento são gravadas em lote pelo escritor de auditoria.
+    """
+
+    def __init__(self, db_path: str, audit_batch_size: int = 500, audit_flush_interval: float = 0.5):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self.audit = AuditLogWriter(self._insert_requests, audit_batch_size, audit_flush_interval)
+
+        self.connection().executescript(SCHEMA)
+
+    def connection(self) -> sqlite3.Connection:
+        """Retorna a conexão da thread atual, criando-a se necessário."""
+
+        conn = getattr(self._local, "conn", None)
+
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+
+            self._local.conn = conn
+
+            with self._lock:
+                self._connections.append(conn)
+
+        return conn
+
+    def get_customer(self, cpf: str):
+        row = self.connection().execute(
+            "SELECT cpf, data_nascimento, nome, score, limite_atual FROM clientes WHERE cpf = ?",
+            (normalize_cpf(cpf),)
+        ).fetchone()
+
+        return dict(row) if row is not None else None
+
+    def get_customers(self, cpfs) -> list:
+        cpfs = list(dict.fromkeys(normalize_cpf(cpf) for cpf in cpfs))
+        conn = self.connection()
+        customers = []
+
+        # Consultas em blocos para respeitar o limite de parâmetros do SQLite.
+        for start in range(0, len(cpfs), 500):
+            chunk = cpfs[start:start + 500]
+            rows = conn.execute(
+                f"SELECT cpf, data_nascimento, nome, score, limite_atual FROM clientes WHERE cpf IN ({', '.join('?' * len(chunk))})",
+                chunk
+            ).fetchall()
+            customers.extend(dict(row) for row in rows)
+
+        return customers
+
+    def update_customer(self, cpf: str, field: str, value) -> bool:
+        if field not in CUSTOMER_FIELDS:
+            raise ValueError(f"Unknown customer field: {field}")
+
+        cursor = self.connection().execute(
+            f"UPDATE clientes SET {field} = ? WHERE cpf = ?",
+            (value, normalize_cpf(cpf))
+        )
+
+        return cursor.rowcount > 0
+
+    def score_bands(self) -> ScoreBands:
+        df = pd.read_sql_query("SELECT score_min, score_max, limite_max FROM score_limite", self.connection())
+
+        return compile_bands(df)
+
+    def max_allowed(self, score):
+        row = self.connection().execute(
+            "SELECT limite_max FROM score_limite WHERE score_min <= ? AND score_max >= ? ORDER BY score_min DESC LIMIT 1",
+            (score, score)
+        ).fetchone()
+
+        return float(row["limite_max"]) if row is not None else None
+
+    def _insert_requests(self, rows):
+        conn = self.connection()
+
+        with conn:
+            conn.execute("BEGIN")
+            conn.executemany(INSERT_REQUEST_SQL, [tuple(row.get(f) for f in REQUEST_FIELDS) for row in rows])
+
+    def log_limit_request(self, request: dict):
+        self.audit.write(request)
+
+    def audit_stats(self) -> dict:
+        return self.audit.stats()
+
+    def warm_up(self):
+        self.score_bands()
+
+    def close(self):
+        self.audit.close()
+
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+
+            self._connections = []
+
+        self._local = threading.local()
+
+def import_csv(db_path: str, clientes_path: str, score_limite_path: str, solicitacoes_path: str):
+    """
+    Importa os CSVs existentes para o banco SQLite.
+    Clientes são inseridos ou substituídos; regras de score são recriadas;
+    o histórico de solicitações é anexado.
+    """
+
+    storage = SqliteStorage(db_path)
+    conn = storage.connection()
+
+    clientes = pd.read_csv(clientes_path, dtype={"cpf": str})
+    clientes["cpf"] = clientes["cpf"].map(normalize_cpf)
+
+    rules = pd.read_csv(score_limite_path)
+    compile_bands(rules)
+
+    with conn:
+        conn.execute("BEGIN")
+
+        conn.executemany(
+            "INSERT OR REPLACE INTO clientes (cpf, data_nascimento, nome, score, limite_atual) VALUES (?, ?, ?, ?, ?)",
+            clientes[["cpf", "data_nascimento", "nome", "score", "limite_atual"]].itertuples(index=False, name=None)
+        )
+
+        conn.execute("DELETE FROM score_limite")
+        conn.executemany(
+            "INSERT INTO score_limite (score_min, score_max, limite_max) VALUES (?, ?, ?)",
+            rules[["score_min", "score_max", "limite_max"]].itertuples(index=False, name=None)
+        )
+
+        if os.path.exists(solicitacoes_path) and os.path.getsize(solicitacoes_path) > 0:
+            solicitacoes = pd.read_csv(solicitacoes_path, dtype={"cpf_cliente": str})
+
+            conn.executemany(
+                INSERT_REQUEST_SQL,
+                solicitacoes[list(REQUEST_FIELDS)].itertuples(index=False, name=None)
+            )
+
+    storage.close()
+
+if __name__ == "__main__":
+    from app.tools.data_tools import CLIENTES_PATH, SCORE_LIMITE_PATH, SOLICITACOES_PATH, SQLITE_PATH
+
+    db_path = sys.argv[1] if len(sys.argv) > 1 else SQLITE_PATH
+
+    import_csv(db_path, CLIENTES_PATH, SCORE_LIMITE_PATH, SOLICITACOES_PATH)
+
+    print(f"Dados importados para {db_path}")
@@ -0,0 +1,83 @@
+from app.tools.audit_log import AuditLogWriter, CsvAuditSink
+from app.tools.customer_store import CustomerStore
+from app.tools.score_rules import ScoreRules, ScoreBands
+
+
+REQUEST_FIELDS = ("cpf_cliente", "data_hora_solicitacao", "limite_atual", "novo_limite_solicitado", "status_pedido")
+
+class StorageBackend:
+    """
+    Interface da camada de armazenamento usada por `app.tools.data_tools`.
+    """
+
+    def get_customer(self, cpf: str):
+        """Retorna o dicionário do cliente com o CPF informado, ou None."""
+        raise NotImplementedError
+
+    def update_customer(self, cpf: str, field: str, value) -> bool:
+        """Atualiza um campo do cliente. Retorna False se o cliente não existir."""
+        raise NotImplementedError
+
+    def get_customers(self, cpfs) -> list:
+        """Retorna os clientes dos CPFs informados (os inexistentes são omitidos)."""
+
+        return [customer for customer in map(self.get_customer, cpfs) if customer is not None]
+
+    def score_bands(self) -> ScoreBands:
+        """Retorna as faixas de score compiladas."""
+        raise NotImplementedError
+
+    def max_allowed(self, score):
+        """Retorna o limite máximo permitido para o score, ou None."""
+        raise NotImplementedError
+
+    def log_limit_request(self, request: dict):
+        """Enfileira o registro de uma solicitação de aumento de limite, sem esperar pela escrita."""
+        raise NotImplementedError
+
+    def audit_stats(self) -> dict:
+        """Contadores do escritor do log de solicitações (gravadas, descartadas...)."""
+
+        return {}
+
+    def warm_up(self):
+        """Carrega os dados antes da primeira requisição."""
+
+    def close(self):
+        """Libera os recursos do backend."""
+
+class CsvStorage(StorageBackend):
+    """
+    Backend padrão, baseado nos arquivos CSV da pasta `data`.
+    """
+
+    def __init__(self, clientes_path: str, score_limite_path: str, solicitacoes_path: str, audit_batch_size: int = 500, audit_flush_interval: float = 0.5):
+        self.customers = CustomerStore(clientes_path)
+        self.rules = ScoreRules(score_limite_path)
+        self.audit = AuditLogWriter(CsvAuditSink(solicitacoes_path, REQUEST_FIELDS), audit_batch_size, audit_flush_interval)
+
+    def get_customer(self, cpf: str):
+        return self.customers.get(cpf)
+
+    def update_customer(self, cpf: str, field: str, value) -> bool:
+        return self.customers.update(cpf, field, value)
+
+    def score_bands(self) -> ScoreBands:
+        return self.rules.bands
+
+    def max_allowed(self, score):
+        return self.rules.max_allowed(score)
+
+    def log_limit_request(self, request: dict):
+        self.audit.write(request)
+
+    def audit_stats(self) -> dict:
+        return self.audit.stats()
+
+    def warm_up(self):
+        self.customers.refresh()
+        self.rules.refresh(force=True)
+
+    def close(self):
+        self.audit.close()
+        self.customers.close()
@@ -0,0 +1,114 @@
+"""
+Benchmark da latência do último turno da entrevista com um LLM falso de
+latência fixa (nenhuma chamada de rede, nada é gravado).
+
+Cenários:
+- antes: o último turno como era antes da normalização em segundo plano
+  (validate_answer + normalize_data de toda a entrevista, em sequência).
+- depois: a entrevista inteira passa por interview_node, com o usuário levando
+  `--think` segundos para responder cada pergunta. Mede-se só o último turno,
+  com respostas que os parsers reconhecem e com respostas que não reconhecem.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_interview --latency 0.3 --runs 5
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+os.environ.setdefault("MICROBATCH_WINDOW_MS", "0")
+
+from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableLambda
+from app.core import llm as llm_module
+from app.core.classifier_cache import classifier_cache
+from app.agents import interview
+
+PARSED_ANSWERS = ["5000", "CLT", "1.200", "2", "não"]
+
+UNPARSED_ANSWERS = ["uns cinco paus", "trabalho de carteira", "metade disso", "um casal de filhos", "um cartão atrasado"]
+
+FAKE_VALUES = {
+    "valid": True, "feedback": "", "is_exit": False,
+    "income": 5000.0, "job_type": "formal", "expenses": 1200.0, "dependents": 2, "has_debts": True
+}
+
+class FakeLLM:
+    """LLM falso: responde qualquer schema com FAKE_VALUES depois de `latency` segundos."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    def with_structured_output(self, schema):
+        async def respond(prompt):
+            self.calls += 1
+            await asyncio.sleep(self.latency)
+            values = {k: v for k, v in FAKE_VALUES.items() if k in schema.model_fields}
+
+            if "cleaned_value" in schema.model_fields:
+                values["cleaned_value"] = prompt.to_messages()[-1].content.split("RESPOSTA:")[-1].strip()
+
+            return schema(**values)
+
+        return RunnableLambda(lambda prompt: None, afunc=respond)
+
+async def before(answers) -> float:
+    started = time.perf_counter()
+    await interview.validate_answer(interview.QUESTIONS[-1], answers[-1])
+    await interview.normalize_data(answers)
+
+    return time.perf_counter() - started
+
+async def after(answers, think: float, thread_id: str) -> float:
+    config = {"configurable": {"thread_id": thread_id}}
+    state = {"messages": [HumanMessage(content="sim")], "interview_step": 0, "user_data": {"cpf": "00000000000"}}
+    elapsed = 0.0
+
+    for answer in [None] + answers:
+        if answer is not None:
+            await asyncio.sleep(think)
+            state["messages"] = state["messages"] + [HumanMessage(content=answer)]
+
+        started = time.perf_counter()
+        update = await interview.interview_node(state, config)
+        elapsed = time.perf_counter() - started
+
+        state.update({k: v for k, v in update.items() if k != "messages"})
+
+    return elapsed
+
+async def main(latency: float, think: float, runs: int):
+    fake = FakeLLM(latency)
+    llm_module.llm = fake
+    interview.update_user_score = lambda cpf, score: True
+
+    scenarios = [
+        ("antes (validate + normalize_data)", lambda i: before(UNPARSED_ANSWERS)),
+        ("depois, respostas reconhecidas", lambda i: after(PARSED_ANSWERS, think, f"parsed-{i}")),
+        ("depois, respostas não reconhecidas", lambda i: after(UNPARSED_ANSWERS, think, f"unparsed-{i}"))
+    ]
+
+    print(f"LLM falso: {latency * 1000:.0f} ms por chamada; tempo para responder: {think:.2f} s")
+
+    for name, scenario in scenarios:
+        timings = []
+
+        for i in range(runs):
+            classifier_cache.clear()
+            timings.append(await scenario(i))
+
+        print(f"{name:38s} último turno: {statistics.median(timings) * 1000:7.1f} ms (mediana de {runs})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.3, help="latência do LLM falso, em segundos")
+    parser.add_argument("--think", type=float, default=0.5, help="tempo do usuário entre as perguntas, em segundos")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.latency, args.think, args.runs))
@@ -0,0 +1,58 @@
+"""
+Benchmark do score vetorizado (app.tools.scoring.score_arrays) contra a
+função escalar calculate_score, em linhas por segundo.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_scoring --rows 3000000 --scalar-rows 200000
+"""
+
+import argparse
+import os
+import time
+from types import SimpleNamespace
+import numpy as np
+
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+
+from app.agents.interview import calculate_score
+from app.tools.scoring import score_arrays
+
+
+def random_profiles(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+
+    return (
+        rng.uniform(0, 20000, n),
+        rng.choice(np.array(["formal", "autônomo", "desempregado"], dtype=object), n),
+        rng.uniform(0, 10000, n),
+        rng.integers(0, 6, n),
+        rng.random(n) < 0.3
+    )
+
+def bench_vectorized(columns) -> float:
+    started = time.perf_counter()
+    score_arrays(*columns)
+
+    return len(columns[0]) / (time.perf_counter() - started)
+
+def bench_scalar(columns) -> float:
+    started = time.perf_counter()
+
+    for income, job_type, expenses, dependents, has_debts in zip(*columns):
+        calculate_score(SimpleNamespace(income=income, job_type=job_type, expenses=expenses, dependents=dependents, has_debts=bool(has_debts)))
+
+    return len(columns[0]) / (time.perf_counter() - started)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=3_000_000, help="linhas para o score vetorizado")
+    parser.add_argument("--scalar-rows", type=int, default=200_000, help="linhas para a função escalar")
+    args = parser.parse_args()
+
+    columns = random_profiles(args.rows)
+    vectorized = bench_vectorized(columns)
+    scalar = bench_scalar(tuple(column[:args.scalar_rows] for column in columns))
+
+    print(f"vetorizado: {vectorized:,.0f} linhas/s ({args.rows:,} linhas)")
+    print(f"escalar:    {scalar:,.0f} linhas/s ({args.scalar_rows:,} linhas)")
+    print(f"ganho:      {vectorized / scalar:.1f}x")
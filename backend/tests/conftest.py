@@ -0,0 +1,77 @@
+import os
+import sys
+
+# Os testes rodam a partir de `backend/` sem instalar o pacote `app`.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# app.core.llm cria o cliente do Gemini na importação; os testes nunca o chamam.
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+
+class AwesomeApiStub:
+    """
+    Servidor HTTP local que imita o endpoint /last/{pares} da AwesomeAPI.
+    Guarda os caminhos pedidos em `paths`; `rates`, `status` e `delay`
+    podem ser alterados durante o teste.
+    """
+
+    def __init__(self):
+        self.rates = {"USD": 5.0, "EUR": 6.0}
+        self.status = 200
+        self.delay = 0.0
+        self.paths = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.paths.append(self.path)
+                time.sleep(stub.delay)
+
+                if stub.status != 200 or not self.path.startswith("/last/"):
+                    self.send_response(stub.status if stub.status != 200 else 404)
+                    self.end_headers()
+                    return
+
+                pairs = self.path[len("/last/"):].split(",")
+                body = {
+                    pair.replace("-", ""): {"bid": str(stub.rates[pair.split("-")[0]])}
+                    for pair in pairs if pair.split("-")[0] in stub.rates
+                }
+                payload = json.dumps(body).encode()
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def awesomeapi(monkeypatch):
+    """Stub da AwesomeAPI com AWESOMEAPI_URL apontando para ele."""
+
+    from app.tools import search_tools
+
+    stub = AwesomeApiStub()
+    monkeypatch.setenv("AWESOMEAPI_URL", stub.url)
+    monkeypatch.setattr(search_tools, "AWESOMEAPI_URL", stub.url)
+
+    yield stub
+
+    stub.close()
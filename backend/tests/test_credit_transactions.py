@@ -0,0 +1,126 @@
+import csv
+import random
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from app.tools import data_tools
+from app.tools import journal as journal_module
+from app.tools.customer_store import CustomerStore
+from app.tools.storage import CsvStorage
+
+
+CUSTOMERS = 200
+THREADS = 32
+REQUESTS_PER_CUSTOMER = 10
+INCREMENTS_PER_CUSTOMER = 20
+
+@pytest.fixture
+def csv_storage(tmp_path, monkeypatch):
+    """CsvStorage em um diretório temporário com CUSTOMERS clientes de score 1000."""
+
+    clientes = tmp_path / "clientes.csv"
+    rows = [f"{10000000000 + i},1990-01-01,Cliente {i},1000,100.0" for i in range(CUSTOMERS)]
+    clientes.write_text("cpf,data_nascimento,nome,score,limite_atual\n" + "\n".join(rows) + "\n", encoding="utf-8")
+    shutil.copy(data_tools.SCORE_LIMITE_PATH, tmp_path / "score_limite.csv")
+
+    storage = CsvStorage(str(clientes), str(tmp_path / "score_limite.csv"), str(tmp_path / "solicitacoes.csv"), audit_flush_interval=0.01)
+    storage.customers.compact_bytes = 4096
+    monkeypatch.setattr(data_tools, "storage", storage)
+
+    yield storage
+
+    storage.close()
+
+def cpfs():
+    return [str(10000000000 + i) for i in range(CUSTOMERS)]
+
+def test_concurrent_read_modify_write_loses_no_updates(csv_storage):
+    def increment(cpf):
+        with data_tools.customer_transaction(cpf):
+            user = data_tools.get_user_data(cpf)
+            assert data_tools.update_user_limit(cpf, user["limite_atual"] + 1)
+
+    work = [cpf for cpf in cpfs() for _ in range(INCREMENTS_PER_CUSTOMER)]
+    random.shuffle(work)
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        list(pool.map(increment, work))
+
+    for cpf in cpfs():
+        assert data_tools.get_user_data(cpf)["limite_atual"] == 100.0 + INCREMENTS_PER_CUSTOMER
+
+    csv_storage.customers.compact()
+    reloaded = CustomerStore(csv_storage.customers.path)
+
+    assert all(reloaded.get(cpf)["limite_atual"] == 100.0 + INCREMENTS_PER_CUSTOMER for cpf in cpfs())
+
+def test_concurrent_limit_requests_are_serialized_and_audited(csv_storage, tmp_path):
+    # Valores acima de 20000 (limite máximo do score 1000) são rejeitados.
+    work = [(cpf, random.choice([500.0, 1000.0, 5000.0, 15000.0, 25000.0])) for cpf in cpfs() for _ in range(REQUESTS_PER_CUSTOMER)]
+    random.shuffle(work)
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        results = list(pool.map(lambda item: data_tools.request_limit_increase(*item), work))
+
+    assert all(result["status"] == ("aprovado" if limit <= 20000 else "rejeitado") for result, (_, limit) in zip(results, work))
+
+    csv_storage.audit.flush()
+
+    with open(tmp_path / "solicitacoes.csv", newline="", encoding="utf-8") as f:
+        audit = list(csv.DictReader(f))
+
+    assert len(audit) == len(work)
+
+    by_cpf = {}
+
+    for row in audit:
+        by_cpf.setdefault(row["cpf_cliente"], []).append(row)
+
+    for cpf in cpfs():
+        rows = sorted(by_cpf[cpf], key=lambda row: row["data_hora_solicitacao"])
+        assert len(rows) == REQUESTS_PER_CUSTOMER
+
+        # Cada pedido viu o limite deixado pelo último pedido aprovado antes dele.
+        limit = 100.0
+
+        for row in rows:
+            assert float(row["limite_atual"]) == limit
+
+            if row["status_pedido"] == "aprovado":
+                limit = float(row["novo_limite_solicitado"])
+
+        assert data_tools.get_user_data(cpf)["limite_atual"] == limit
+
+def test_updates_to_different_customers_overlap(csv_storage, monkeypatch):
+    customers = csv_storage.customers
+    customers.compact_bytes = 1 << 30
+    journal = customers.journal
+    fsync = journal_module.os.fsync
+
+    def slow_fsync(fd):
+        time.sleep(0.05)
+        fsync(fd)
+
+    monkeypatch.setattr(journal_module.os, "fsync", slow_fsync)
+
+    updates = cpfs()[:THREADS]
+    start = threading.Barrier(len(updates))
+
+    def update(cpf):
+        start.wait()
+        assert customers.update(cpf, "limite_atual", 500.0)
+
+    started = time.monotonic()
+
+    with ThreadPoolExecutor(len(updates)) as pool:
+        list(pool.map(update, updates))
+
+    elapsed = time.monotonic() - started
+
+    # Em série seriam THREADS fsyncs de 50 ms; em paralelo, as atualizações dividem poucos fsyncs.
+    assert journal.appends == len(updates)
+    assert journal.fsyncs <= 4
+    assert elapsed < len(updates) * 0.05 / 4
+    assert all(customers.get(cpf)["limite_atual"] == 500.0 for cpf in updates)
@@ -0,0 +1,50 @@
+import asyncio
+from langchain_core.messages import HumanMessage
+from app.agents import exchange
+from app.models.schemas import CurrencyTurn, SUPPORTED_CURRENCIES
+from app.tools import search_tools
+from app.tools.rate_cache import RateCache
+
+
+def test_refresh_rates_fetches_all_currencies_in_one_call(awesomeapi, monkeypatch):
+    cache = RateCache(search_tools._fetch_rate, ttl=30, stale_ttl=300)
+    monkeypatch.setattr(search_tools, "rate_cache", cache)
+    awesomeapi.rates = {currency: float(i + 1) for i, currency in enumerate(SUPPORTED_CURRENCIES)}
+
+    async def scenario():
+        try:
+            return await search_tools.refresh_rates()
+
+        finally:
+            await search_tools.close_http_client()
+
+    published = asyncio.run(scenario())
+
+    assert awesomeapi.paths == ["/last/" + ",".join(f"{currency}-BRL" for currency in SUPPORTED_CURRENCIES)]
+    assert published == len(SUPPORTED_CURRENCIES)
+    assert set(cache.snapshot()) == set(SUPPORTED_CURRENCIES)
+
+def test_exchange_node_makes_no_network_calls_while_snapshot_is_fresh(awesomeapi, monkeypatch):
+    cache = RateCache(search_tools._fetch_rate, ttl=30, stale_ttl=300)
+    monkeypatch.setattr(search_tools, "rate_cache", cache)
+
+    async def fake_classify(chain, schema, prompt_version, inputs, cacheable=True):
+        return CurrencyTurn(currency_code="EUR", is_exit=False)
+
+    monkeypatch.setattr(exchange, "classify", fake_classify)
+
+    async def scenario():
+        try:
+            await search_tools.refresh_rates()
+            awesomeapi.paths.clear()
+
+            return [await exchange.exchange_node({"messages": [HumanMessage(content="qual a cotação do euro?")]}) for _ in range(5)]
+
+        finally:
+            await search_tools.close_http_client()
+
+    replies = asyncio.run(scenario())
+
+    assert awesomeapi.paths == []
+    assert all("R$ 6.00" in reply["messages"][0].content for reply in replies)
+    assert cache.hits == 5 and cache.upstream_calls == 0
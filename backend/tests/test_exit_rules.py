@@ -0,0 +1,32 @@
+import pytest
+from app.core.exit_rules import match_exit_rules
+
+
+# Um True/False errado aqui não é visto pelo LLM: na dúvida a regra deve retornar None.
+
+@pytest.mark.parametrize("message, expected", [
+    ("tchau", True),
+    ("ok, obrigado, tchau", True),
+    ("pode encerrar o atendimento", True),
+    ("não, obrigado", True),
+    ("era só isso", True),
+    ("", False),
+    ("5000", False),
+    ("R$ 3.500,00", False),
+    ("12345678900", False),
+    ("15 de março de 1990", False),
+    ("oi", False),
+    ("sim", False),
+    ("clt", False),
+    ("quero aumentar meu limite", False),
+    ("qual a cotação do dólar?", False),
+    ("obrigado, boa noite", None),
+    ("valeu, boa noite!", None),
+    ("era isso, boa tarde", None),
+    ("bom dia", None),
+    ("tchau, mas antes quero ver meu limite", None),
+    ("não quero aumento de limite", None),
+    ("talvez depois", None)
+])
+def test_match_exit_rules(message, expected):
+    assert match_exit_rules(message) is expected
@@ -0,0 +1,63 @@
+import pytest
+from app.core.interview_parsers import parse_dependents, parse_job_type, parse_money, parse_yes_no
+
+
+# Os parsers decidem o score sem passar pelo LLM: na dúvida devem retornar None.
+
+@pytest.mark.parametrize("answer, expected", [
+    ("5000", 5000.0),
+    ("R$ 3.500,00", 3500.0),
+    ("R$3.500", 3500.0),
+    ("5k", 5000.0),
+    ("2,5 mil", 2500.0),
+    ("ganho uns 4 mil por mês", 4000.0),
+    ("1.200 reais", 1200.0),
+    ("3500/mês", 3500.0),
+    ("nada", 0.0),
+    ("1 salário mínimo", None),
+    ("2 salários mínimos", None),
+    ("trabalho 8 horas e ganho bem", None),
+    ("ganho 5000 e gasto 2000", None),
+    ("uns cinco paus", None),
+    ("1.20.0", None)
+])
+def test_parse_money(answer, expected):
+    assert parse_money(answer) == expected
+
+@pytest.mark.parametrize("answer, expected", [
+    ("CLT", "formal"),
+    ("sou freela", "autônomo"),
+    ("estou desempregado", "desempregado"),
+    ("CLT e PJ", None),
+    ("trabalho de carteira", None)
+])
+def test_parse_job_type(answer, expected):
+    assert parse_job_type(answer) == expected
+
+@pytest.mark.parametrize("answer, expected", [
+    ("2", 2),
+    ("dois filhos", 2),
+    ("tenho um filho", 1),
+    ("só uma filha", 1),
+    ("nenhum", 0),
+    ("não tenho", 0),
+    ("um casal de filhos", None),
+    ("sou mãe de um", None),
+    ("2 filhos e 1 enteado", None),
+    ("não sei", None)
+])
+def test_parse_dependents(answer, expected):
+    assert parse_dependents(answer) == expected
+
+@pytest.mark.parametrize("answer, expected", [
+    ("sim", True),
+    ("tenho um empréstimo", True),
+    ("não", False),
+    ("não tenho", False),
+    ("nenhuma", False),
+    ("não sei", None),
+    ("não quero continuar", None),
+    ("um cartão atrasado", None)
+])
+def test_parse_yes_no(answer, expected):
+    assert parse_yes_no(answer) == expected
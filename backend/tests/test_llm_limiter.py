@@ -0,0 +1,128 @@
+import asyncio
+import pytest
+from langchain_core.runnables import RunnableLambda
+from app.core.llm_limiter import PRIORITY_AUTH, PRIORITY_LOW, AdaptiveLimiter, llm_priority_scope
+
+
+class ProviderError(Exception):
+    def __init__(self, code: int):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+class FakeLLM:
+    """LLM local que responde 429 quando mais de `capacity` chamadas rodam ao mesmo tempo."""
+
+    def __init__(self, capacity: int, latency: float = 0.01):
+        self.capacity = capacity
+        self.latency = latency
+        self.running = 0
+        self.throttled = 0
+
+    async def respond(self, prompt):
+        self.running += 1
+
+        try:
+            if self.running > self.capacity:
+                self.throttled += 1
+                raise ProviderError(429)
+
+            await asyncio.sleep(self.latency)
+
+            return f"ok {prompt}"
+
+        finally:
+            self.running -= 1
+
+    def runnable(self):
+        return RunnableLambda(lambda prompt: None, afunc=self.respond)
+
+def fast_limiter(**kwargs) -> AdaptiveLimiter:
+    return AdaptiveLimiter(base_delay=0.01, max_delay=0.05, **kwargs)
+
+def test_overload_completes_all_calls_and_lowers_the_limit():
+    fake = FakeLLM(capacity=4)
+    limiter = fast_limiter(initial=16, max_retries=20)
+    llm = limiter.wrap(fake.runnable())
+
+    async def scenario():
+        return await asyncio.gather(*(llm.ainvoke(i) for i in range(100)))
+
+    results = asyncio.run(scenario())
+
+    assert results == [f"ok {i}" for i in range(100)]
+    assert fake.throttled > 0
+    assert limiter.limit < 16
+    assert limiter.failures == 0
+    assert limiter.in_flight == 0
+
+def test_non_retryable_error_is_raised_on_first_failure():
+    limiter = fast_limiter()
+    attempts = []
+
+    async def call():
+        attempts.append(1)
+        raise ProviderError(400)
+
+    with pytest.raises(ProviderError):
+        asyncio.run(limiter.run(call))
+
+    assert len(attempts) == 1
+    assert limiter.retries == 0
+    assert limiter.failures == 1
+    assert limiter.in_flight == 0
+
+def test_auth_waiters_are_served_before_low_priority():
+    limiter = fast_limiter(initial=1, max_limit=1)
+    order = []
+
+    async def call(name):
+        order.append(name)
+        await asyncio.sleep(0.01)
+
+    async def caller(name, priority):
+        with llm_priority_scope(priority):
+            await limiter.run(lambda: call(name))
+
+    async def scenario():
+        blocker = asyncio.create_task(limiter.run(lambda: call("blocker")))
+        await asyncio.sleep(0)
+
+        low = [asyncio.create_task(caller(f"low{i}", PRIORITY_LOW)) for i in range(3)]
+        await asyncio.sleep(0)
+        auth = [asyncio.create_task(caller(f"auth{i}", PRIORITY_AUTH)) for i in range(3)]
+
+        await asyncio.gather(blocker, *low, *auth)
+
+    asyncio.run(scenario())
+
+    assert order == ["blocker", "auth0", "auth1", "auth2", "low0", "low1", "low2"]
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    limiter = fast_limiter(initial=1, max_limit=1)
+
+    async def scenario():
+        await limiter.acquire()
+
+        # Cancelado ainda na fila.
+        queued = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        queued.cancel()
+
+        # Cancelado depois de receber a vaga, antes de voltar a rodar.
+        granted = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        limiter.release()
+        granted.cancel()
+
+        for task in (queued, granted):
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        assert limiter.in_flight == 0
+
+        await asyncio.wait_for(limiter.run(lambda: asyncio.sleep(0)), timeout=1)
+
+    asyncio.run(scenario())
+
+    assert limiter.in_flight == 0
+    assert limiter.stats()["waiting"] == 0
@@ -0,0 +1,59 @@
+import asyncio
+import time
+from langchain_core.runnables import RunnableLambda
+from app.core.micro_batcher import MicroBatcher
+
+
+class FakeChain:
+    """Chain local que registra o tamanho de cada lote recebido."""
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.batches = []
+
+    async def respond(self, prompt):
+        await asyncio.sleep(self.latency)
+
+        return f"ok {prompt}"
+
+    def runnable(self):
+        chain = self
+
+        class Recorder(RunnableLambda):
+            async def abatch(self, inputs, config=None, **kwargs):
+                chain.batches.append(len(inputs))
+                return await super().abatch(inputs, config, **kwargs)
+
+        return Recorder(lambda prompt: None, afunc=self.respond)
+
+def test_idle_call_is_sent_without_waiting_for_the_window():
+    fake = FakeChain(latency=0)
+    batcher = MicroBatcher(fake.runnable(), window=0.5)
+
+    async def scenario():
+        started = time.monotonic()
+        result = await batcher.ainvoke("a")
+
+        return result, time.monotonic() - started
+
+    result, elapsed = asyncio.run(scenario())
+
+    assert result == "ok a"
+    assert elapsed < 0.1
+    assert batcher.stats()["immediate"] == 1
+
+def test_calls_during_a_batch_are_grouped_and_deduplicated():
+    fake = FakeChain(latency=0.05)
+    batcher = MicroBatcher(fake.runnable(), window=0.01)
+
+    async def scenario():
+        first = asyncio.create_task(batcher.ainvoke("a"))
+        await asyncio.sleep(0)
+
+        return await asyncio.gather(first, *(batcher.ainvoke(p) for p in ["a", "b", "c", "b"]))
+
+    results = asyncio.run(scenario())
+
+    assert results == ["ok a", "ok a", "ok b", "ok c", "ok b"]
+    assert fake.batches == [1, 2]
+    assert batcher.deduplicated == 2
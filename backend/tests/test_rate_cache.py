@@ -0,0 +1,90 @@
+import asyncio
+import pytest
+from app.tools import search_tools
+from app.tools.rate_cache import RateCache
+
+
+def use_cache(monkeypatch, ttl: float, stale_ttl: float) -> RateCache:
+    cache = RateCache(search_tools._fetch_rate, ttl=ttl, stale_ttl=stale_ttl)
+    monkeypatch.setattr(search_tools, "rate_cache", cache)
+
+    return cache
+
+def run(coro):
+    async def main():
+        try:
+            return await coro
+
+        finally:
+            await search_tools.close_http_client()
+
+    return asyncio.run(main())
+
+def test_burst_shares_a_single_upstream_call(awesomeapi, monkeypatch):
+    cache = use_cache(monkeypatch, ttl=30, stale_ttl=300)
+    awesomeapi.delay = 0.2
+
+    async def burst():
+        return await asyncio.gather(*[search_tools.get_exchange_quote("USD") for _ in range(50)])
+
+    quotes = run(burst())
+
+    assert awesomeapi.paths == ["/last/USD-BRL"]
+    assert {quote.rate for quote in quotes} == {5.0}
+    assert cache.upstream_calls == 1
+
+def test_serves_from_memory_within_ttl(awesomeapi, monkeypatch):
+    cache = use_cache(monkeypatch, ttl=30, stale_ttl=300)
+
+    async def scenario():
+        first = await search_tools.get_exchange_quote("USD")
+        awesomeapi.rates["USD"] = 9.0
+        second = await search_tools.get_exchange_quote("USD")
+
+        return first, second
+
+    first, second = run(scenario())
+
+    assert first.rate == second.rate == 5.0
+    assert not second.stale
+    assert len(awesomeapi.paths) == 1
+    assert cache.hits == 1
+
+def test_refreshes_in_background_within_stale_window(awesomeapi, monkeypatch):
+    cache = use_cache(monkeypatch, ttl=0.3, stale_ttl=30)
+
+    async def scenario():
+        await search_tools.get_exchange_quote("USD")
+        awesomeapi.rates["USD"] = 7.0
+        await asyncio.sleep(0.4)
+
+        stale = await search_tools.get_exchange_quote("USD")
+        await asyncio.sleep(0.1)
+        refreshed = await search_tools.get_exchange_quote("USD")
+
+        return stale, refreshed
+
+    stale, refreshed = run(scenario())
+
+    assert stale.rate == 5.0 and not stale.stale
+    assert refreshed.rate == 7.0
+    assert len(awesomeapi.paths) == 2
+    assert cache.stale_hits == 1
+
+def test_serves_last_good_quote_with_age_when_upstream_fails(awesomeapi, monkeypatch):
+    cache = use_cache(monkeypatch, ttl=0.05, stale_ttl=0.05)
+
+    async def scenario():
+        await search_tools.get_exchange_quote("USD")
+        awesomeapi.status = 503
+        await asyncio.sleep(0.2)
+
+        return await search_tools.get_exchange_quote("USD"), await search_tools.get_exchange_quote("EUR")
+
+    last_good, never_fetched = run(scenario())
+
+    assert last_good.rate == 5.0
+    assert last_good.stale
+    assert last_good.age == pytest.approx(0.2, abs=0.15)
+    assert never_fetched is None
+    assert cache.upstream_errors == 2
@@ -0,0 +1,57 @@
+import contextlib
+import io
+import numpy as np
+import pandas as pd
+from types import SimpleNamespace
+from app.agents.interview import calculate_score
+from app.tools.scoring import rescore_file, score_arrays
+
+
+def random_profiles(n: int, seed: int = 0):
+    """Perfis aleatórios incluindo NaN, inf, divisor zero e has_debts inválido."""
+
+    rng = np.random.default_rng(seed)
+
+    income = rng.choice([0, 1000, 5000, 1e5, 1e9, np.nan, np.inf, -500], n) * rng.random(n)
+    expenses = rng.choice([-1, 0, 100, 1000, -2], n).astype(float) * rng.choice([1, 1, 0.5], n)
+    dependents = rng.choice([0, 1, 2, 3, 5, -1, 1.5, np.nan], n)
+    job_type = rng.choice(np.array(["formal", "autônomo", "desempregado", "autonomo", None], dtype=object), n)
+    has_debts = np.array(rng.choice(np.array([True, False, 1, 0, "x", None, np.nan, 2], dtype=object), n), dtype=object)
+
+    return income, job_type, expenses, dependents, has_debts
+
+def scalar_scores(income, job_type, expenses, dependents, has_debts):
+    with contextlib.redirect_stdout(io.StringIO()), np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        return np.array([
+            calculate_score(SimpleNamespace(income=a, job_type=b, expenses=c, dependents=d, has_debts=e))
+            for a, b, c, d, e in zip(income, job_type, expenses, dependents, has_debts)
+        ])
+
+def test_score_arrays_matches_calculate_score():
+    columns = random_profiles(50000)
+
+    vectorized = score_arrays(*columns)
+    scalar = scalar_scores(*columns)
+
+    mismatches = np.flatnonzero(vectorized != scalar)
+
+    assert len(mismatches) == 0, [tuple(column[i] for column in columns) for i in mismatches[:5]]
+
+def test_rescore_file_matches_calculate_score(tmp_path):
+    income, job_type, expenses, dependents, has_debts = random_profiles(5000, seed=1)
+    has_debts = np.where(pd.Series(has_debts).map(lambda v: v is True or v is False), has_debts, True).astype(bool)
+
+    pd.DataFrame({
+        "cpf": [f"{i:011d}" for i in range(len(income))],
+        "income": income,
+        "job_type": job_type,
+        "expenses": expenses,
+        "dependents": dependents,
+        "has_debts": has_debts
+    }).to_csv(tmp_path / "perfis.csv", index=False)
+
+    rows = rescore_file(str(tmp_path / "perfis.csv"), str(tmp_path / "scores.csv"), chunksize=1000)
+    scores = pd.read_csv(tmp_path / "scores.csv", dtype={"cpf": str})
+
+    assert rows == len(income)
+    assert (scores["score"].to_numpy() == scalar_scores(income, job_type, expenses, dependents, has_debts)).all()
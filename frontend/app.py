@@ -2,12 +2,15 @@ import streamlit as st
 import requests
 import uuid
 import os
-import time
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 load_dotenv()
 
 API_URL = os.getenv("API_URL", "http://localhost:8000")
+REQUEST_TIMEOUT = (3.05, float(os.getenv("API_READ_TIMEOUT", "60")))
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "20"))
 
 st.set_page_config(page_title="Banco Ágil", page_icon="🏦", layout="wide")
 
@@ -48,23 +51,50 @@ typing_css = """
 """
 st.markdown(typing_css, unsafe_allow_html=True)
 
-def stream_data(text):
-    for word in text.split(" "):
-        yield word + " "
-        time.sleep(0.05)
+@st.cache_resource
+def get_http_session():
+    """
+    Sessão HTTP compartilhada entre os reruns: reaproveita conexões (keep-alive)
+    e refaz a chamada apenas quando a conexão não chegou a ser aberta. Um
+    502/504 pode chegar depois de o backend já ter processado o turno (ex:
+    aumento de limite aprovado), então respostas de erro não são repetidas.
+    """
+
+    retry = Retry(
+        total=3,
+        connect=3,
+        read=0,
+        status=0,
+        backoff_factor=0.3,
+        allowed_methods=["POST"]
+    )
+
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry))
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry))
+
+    return session
+
+def send_message(message):
+    return get_http_session().post(
+        f"{API_URL}/chat",
+        json={"message": message, "session_id": st.session_state.session_id},
+        timeout=REQUEST_TIMEOUT
+    )
+
+def show_older_messages():
+    st.session_state.visible_messages += HISTORY_PAGE_SIZE
 
 def init_chat():
     if "session_id" not in st.session_state:
         st.session_state.session_id = str(uuid.uuid4())
     
     st.session_state.chat_history = []
+    st.session_state.visible_messages = HISTORY_PAGE_SIZE
     
     with st.spinner("Iniciando atendimento..."):
         try:
-            response = requests.post(
-                f"{API_URL}/chat", 
-                json={"message": "Olá", "session_id": st.session_state.session_id}
-            )
+            response = send_message("Olá")
             
             if response.status_code == 200:
                 data = response.json()
@@ -73,7 +103,7 @@ def init_chat():
             else:
                  st.session_state.chat_history.append({"role": "assistant", "content": "Olá! (Erro ao conectar com o agente)"})
             
-        except requests.exceptions.ConnectionError:
+        except requests.exceptions.RequestException:
             st.session_state.chat_history.append({"role": "assistant", "content": "Olá! (Sistema indisponível no momento)"})
 
 LOGO_PATH = "img/logo.png"
@@ -82,6 +112,7 @@ AVATAR_PATH = "img/atendente.png"
 def reset_session():
     st.session_state.session_id = str(uuid.uuid4())
     st.session_state.chat_history = []
+    st.session_state.visible_messages = HISTORY_PAGE_SIZE
 
 with st.sidebar:
     if os.path.exists(LOGO_PATH):
@@ -105,8 +136,14 @@ st.caption("Conectado ao Suporte Online")
 if "chat_history" not in st.session_state or not st.session_state.chat_history:
     init_chat()
 
+history = st.session_state.chat_history
+first_visible = max(0, len(history) - st.session_state.get("visible_messages", HISTORY_PAGE_SIZE))
+
+if first_visible > 0:
+    st.button(f"Mostrar mensagens anteriores ({first_visible})", on_click=show_older_messages)
 
-for i, message in enumerate(st.session_state.chat_history):
+for i in range(first_visible, len(history)):
+    message = history[i]
     is_assistant = message["role"] == "assistant"
     avatar = AVATAR_PATH if is_assistant else "👤"
     name_label = "Atendente" if is_assistant else "Você"
@@ -145,10 +182,7 @@ if prompt:
             )
             
             try:
-                response = requests.post(
-                    f"{API_URL}/chat", 
-                    json={"message": prompt, "session_id": st.session_state.session_id}
-                )
+                response = send_message(prompt)
                 
                 typing_placeholder.empty()
                 
@@ -156,7 +190,7 @@ if prompt:
                     data = response.json()
                     bot_response = data.get("response", "Sem resposta do sistema.")
                     
-                    st.write_stream(stream_data(bot_response))
+                    st.markdown(bot_response)
                     st.session_state.chat_history.append({"role": "assistant", "content": bot_response})
                     
                 else:
@@ -164,7 +198,7 @@ if prompt:
                     st.error(error_msg)
                     st.session_state.chat_history.append({"role": "assistant", "content": error_msg})
     
-            except requests.exceptions.ConnectionError:
+            except requests.exceptions.RequestException:
                 typing_placeholder.empty()
                 error_msg = "🚨 Falha na conexão! O sistema está indisponível."
                 st.error(error_msg)